@@ -5,8 +5,11 @@
 # 
 #       Generate a properly scaled 1x/2x/3x set of PNGs, optionally with
 #       generated JSON metadata and/or subfolders, for each single given image.
-#       For use with, like, all those Xcode asset catalogs and shit.
-#       Requires the Pillow and docopt modules; optionally makes use of six.
+#       For use with, like, all those Xcode asset catalogs and shit -- and,
+#       as called for, WebP/AVIF variants and Android density buckets too.
+#       Requires the Pillow and docopt modules; optionally makes use of six,
+#       and of NumPy -- for the “numpy” resampling backend.
+#       Sanitizing help and version text requires `replsanitize`, as well.
 # 
 #       © 2016 - 2019 Alexander Böhn, All Rights Reserved.
 # 
@@ -15,12 +18,28 @@ Usage:
   asscat.py SOURCE... [   -d DIRECTORY  |  --destination=DIRECTORY  ]
                       [   -s SIZE       |  --size=SIZE              ]
                       [   -i METHOD     |  --interpolation=METHOD   ]
+                      [   -m METHOD     |  --downscaling=METHOD     ]
+                      [   -x PIXELS     |  --largest=PIXELS         ]
+                      [   -b BACKEND    |  --backend=BACKEND        ]
+                      [   -t TARGETS    |  --targets=TARGETS        ]
+                      [   -F FORMATS    |  --formats=FORMATS        ]
                       [ [ -c NAME       |  --catalog=NAME         ] |
                         [ -D            |  --catalog-directory    ] ]
                       [   -f            |  --create-subfolders      ]
                       [   -j            |  --write-contents-json    ]
                       [   -C            |  --asset-catalog          ]
+                      [   -J JOBS       |  --jobs=JOBS              ]
+                      [   -u            |  --incremental            ]
+                      [   -p PROFILE    |  --profile=PROFILE        ]
+                      [   -R            |  --recompress             ]
+                      [   -W            |  --watch                  ]
                       [   -V            |  --verbose                ]
+  asscat.py SOURCE... ( -B            |  --benchmark-downscaling  )
+                      [   -s SIZE       |  --size=SIZE              ]
+                      [   -i METHOD     |  --interpolation=METHOD   ]
+  asscat.py SOURCE... ( -K            |  --benchmark-backends     )
+                      [   -s SIZE       |  --size=SIZE              ]
+                      [   -i METHOD     |  --interpolation=METHOD   ]
   asscat.py               -S            |  --show-valid-sizes
   asscat.py               -I            |  --show-interpolation-methods
   asscat.py               -O            |  --show-save-options
@@ -31,7 +50,8 @@ Usage:
   
 Arguments:
   SOURCE                                source image file(s), in a format or
-                                        formats that PIL/Pillow can decode.
+                                        formats that PIL/Pillow can decode -- or
+                                        directories of such files.
   
 Options:
   -d DIRECTORY --destination=DIRECTORY  destination directory [default: $PWD].
@@ -41,6 +61,34 @@ Options:
                                        “box”, “bilinear”, “bicubic”, “hamming”,
                                        “lanczos”, or “nearest” — q.v. the Pillow
                                         module source for notes [default: bicubic].
+  -m METHOD --downscaling=METHOD        how smaller sizes are derived; one of either:
+                                       “direct”, resizing the source every time;
+                                       “pyramid”, resizing each from the previous,
+                                        larger size; or “reduce”, using Pillow’s
+                                        fast integer-factor box filter wherever it
+                                        fits, e.g. 2x → 1x [default: direct].
+  -x PIXELS --largest=PIXELS            maximum width or height, in pixels, of the
+                                        source-sized images; larger sources are
+                                        scaled down to fit -- JPEGs get decoded at
+                                        a reduced resolution to start with -- and
+                                        “0” imposes no maximum [default: 0].
+  -b BACKEND --backend=BACKEND          resampling backend; either “pillow” or, if
+                                        NumPy is installed, “numpy” -- a separable
+                                        filter with weights computed once for each
+                                        combination of source and output pixel
+                                        sizes [default: pillow].
+  -t TARGETS --targets=TARGETS          comma-separated list of sizes to generate,
+                                        from amongst “1x”, “2x” and “3x” and the
+                                        Android densities “mdpi”, “hdpi”, “xhdpi”,
+                                       “xxhdpi” and “xxxhdpi” -- each of which is
+                                        written to a “drawable-DENSITY” subfolder;
+                                        sizes with the same scale factor share one
+                                        downscale [default: 1x,2x,3x].
+  -F FORMATS --formats=FORMATS          comma-separated list of output formats, from
+                                        amongst “png”, “webp” and “avif” -- as the
+                                        installed Pillow supports them -- in which
+                                        to write each target size; only PNGs go in
+                                       “Contents.json” files [default: png].
   -c NAME --catalog=NAME                to put generated files into a folder named
                                        “NAME.xcassets” or not [default: «Assets»].
   -D --catalog-directory               “-c Assets” shortcut – the Xcode default;
@@ -53,14 +101,44 @@ Options:
                                         per the asset catalog structure Xcode and
                                        `assetutil` assume, or not [default: not].
   -C --asset-catalog                    shortcut for specifying “-D -f -j”.
+  -J JOBS --jobs=JOBS                   number of worker processes across which to
+                                        spread the decoding, resizing and encoding
+                                        of source images; “0” uses one per CPU
+                                        [default: 1].
+  -u --incremental                      to skip source images that haven’t changed
+                                        since the last incremental build, as per
+                                        the “.asscat-manifest.json” file written
+                                        next to “Contents.json” -- and overwrite
+                                        previously-built outputs of those that have
+                                        changed -- or not [default: not].
+  -p PROFILE --profile=PROFILE          PNG encode profile; one of either “fast”,
+                                       “balanced” or “archival” -- the slowest, and
+                                        smallest -- q.v. “--show-save-options” sub.
+                                        [default: archival].
+  -R --recompress                       to recompress the newly-built images with
+                                        the “archival” profile in the background,
+                                        once the build is done, or not -- for use
+                                        with a faster profile [default: not].
+  -W --watch                            to keep running, watching the sources for
+                                        changes -- and regenerating the imagesets
+                                        of those that change, incrementally, each
+                                        time -- until interrupted, or not; implies
+                                       “--incremental” [default: not].
   -V --verbose                          to spew extemporaneous blathery diagnostics
                                         to STDOUT throughout the course of this
                                         programs’ execution, or not [default: not].
+  -B --benchmark-downscaling            exit after timing each downscaling method
+                                        on the source images, and comparing their
+                                        output to that of the “direct” method.
+  -K --benchmark-backends               exit after timing each resampling backend
+                                        on the source images, and comparing their
+                                        output to that of the “pillow” backend.
   -S --show-valid-sizes                 exit after showing valid “size” arguments.
   -I --show-interpolation-methods       exit after showing possible interpolation-
                                         method arguments.
   -O --show-save-options                exit after showing the output image options
-                                        as passed to ‘PIL.Image.Image.save(…)’.
+                                        for each encode profile and format, as
+                                        passed to ‘PIL.Image.Image.save(…)’.
   -H --show-sanitized-help              exit after showing this help text, after
                                         sanitizing it as ASCII-safe.
   --show-sanitized-version              exit after showing this programs’ version,
@@ -71,13 +149,33 @@ Options:
 """
 
 from __future__ import print_function, unicode_literals
-from collections import OrderedDict
 from docopt import docopt, DocoptExit
 from PIL import Image
+import errno
+import hashlib
+import io
+import math
+import multiprocessing
 import warnings
 import sys, os
 import json
 import re
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from functools import lru_cache
+except ImportError:
+    def lru_cache(**keywrds):
+        """ No-op dummy decorator for lesser Pythons """
+        def inside(function):
+            return function
+        return inside
 
 DEBUG = bool(int(os.environ.get('DEBUG', '0'), base=10))
 PY3 = False
@@ -92,6 +190,11 @@ else:
 if PY3:
     unicode = str
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 VERSION = u'asscat.py 0.4.8 © 2016-2019 Alexander Böhn / OST, LLC'
 
 class DebugExit(SystemExit):
@@ -117,13 +220,21 @@ class OptionsWarning(RuntimeWarning):
 # for our purposes a “size” is one of these:
 sizes = frozenset({ '1x', '2x', '3x' })
 
+# … or, as a target, one of these Android screen densities -- each with its
+# scale factor, relative to “mdpi” (which is to say, “1x”):
+densities = { 'mdpi'    : 1.0,
+              'hdpi'    : 1.5,
+              'xhdpi'   : 2.0,
+              'xxhdpi'  : 3.0,
+              'xxxhdpi' : 4.0 }
+
 def sizer(factor=2):
     """ Return a lambda suitable for applying to an image size tuple """
     return lambda x: int(factor * x)
 
 def interpol(name):
     """ Return a PIL/Pillow image interpolation method constant by name """
-    return getattr(Image, name.upper())
+    return getattr(Image, interpol.aliases.get(name.lower(), name).upper())
 
 # q.v. PIL.Image module constants with these same (albiet uppercased) names,
 # https://git.io/fhFxV supra.:
@@ -135,10 +246,165 @@ interpol.methods = frozenset({
                         "bicubic", "cubic",
                         "lanczos", "antialias" })
 
+# the names above that newer Pillows no longer define, and the names
+# of the constants for which they were aliases:
+interpol.aliases = { "linear"    : "bilinear",
+                     "cubic"     : "bicubic",
+                     "antialias" : "lanczos" }
+
 # the default interpolation method:
 interpol.default = "bicubic"
 
-def scaler(image, factor=2, interpolation=interpol.default, verbose=False):
+def resize(image, dimensions, interpolation=interpol.default, backend=None):
+    """ Resize an image to the given dimensions with a named interpolation
+        method, using a named resampling backend -- one of those in the
+        `resize.backends` dictionary sub.
+    """
+    return resize.backends[backend or resize.default](image, dimensions,
+                                                             interpolation)
+
+def pillow_resize(image, dimensions, interpolation=interpol.default):
+    """ Resize an image with ‘PIL.Image.Image.resize(…)’ """
+    return image.resize(dimensions, interpol(interpolation))
+
+def numpy_weights(in_size, out_size, interpolation=interpol.default):
+    """ Compute the matrix of coefficients with which a separable filter
+        resamples one axis of an image, from “in_size” to “out_size” pixels,
+        as Pillow’s own “precompute_coeffs(…)” does it -- q.v. “Resample.c”
+        in the Pillow source, and `resize_plan(…)` sub.
+    """
+    support, kernel = numpy_resize.filters[interpol(interpolation)]
+    scale = float(in_size) / out_size
+    filterscale = max(scale, 1.0)
+    support *= filterscale
+    centers = (numpy.arange(out_size) + 0.5) * scale
+    xmin = numpy.maximum(numpy.trunc(centers - support + 0.5), 0)
+    xmax = numpy.minimum(numpy.trunc(centers + support + 0.5), in_size)
+    x = numpy.arange(in_size)[numpy.newaxis, :]
+    weights = kernel((x - centers[:, numpy.newaxis] + 0.5) / filterscale)
+    weights[(x < xmin[:, numpy.newaxis]) | (x >= xmax[:, numpy.newaxis])] = 0.0
+    totals = weights.sum(axis=1, keepdims=True)
+    weights /= numpy.where(totals == 0.0, 1.0, totals)
+    return numpy.floor(weights * numpy_weights.scale + 0.5) / numpy_weights.scale
+
+# Pillow’s coefficients are fixed-point numbers, with this many fractional
+# bits -- and the weights come out exactly the same, when rounded likewise:
+numpy_weights.precision = 22
+numpy_weights.scale = float(1 << numpy_weights.precision)
+
+# the number of resampling plans to keep around, q.v. `resize_plan(…)` sub.:
+RESIZE_PLAN_CACHE_SIZE = 32
+
+@lru_cache(maxsize=RESIZE_PLAN_CACHE_SIZE)
+def resize_plan(src_size, dst_size, interpolation=interpol.default):
+    """ Return the plan for resampling images from “src_size” to “dst_size”
+        pixels -- both (width, height) tuples -- with a named interpolation
+        method: a tuple of the vertical and horizontal coefficient matrices,
+        as per `numpy_weights(…)` supra., either of which is None if its axis
+        is left as-is. Plans are kept in a process-wide LRU cache, as icon
+        sets tend to be full of same-sized images -- q.v. `plan_cache_info()`
+        sub. for its hit and miss counts.
+    """
+    (width, height), (new_width, new_height) = src_size, dst_size
+    vertical = horizontal = None
+    if height != new_height:
+        vertical = numpy_weights(height, new_height, interpolation)
+    if width != new_width:
+        horizontal = numpy_weights(width, new_width, interpolation)
+    return vertical, horizontal
+
+def print_plan_cache_info(backend=None):
+    """ Print the state of the `resize_plan(…)` cache in this process --
+        which may be a pool worker -- if the named backend makes use of it
+    """
+    info = plan_cache_info()
+    if info and (backend or resize.default) in resize.planned:
+        print("» Resize plan cache (pid %i): %s" % (os.getpid(), info))
+
+def plan_cache_info():
+    """ Describe the state of the `resize_plan(…)` cache in this process,
+        as a string -- or return None where there’s no cache to describe
+    """
+    if not hasattr(resize_plan, 'cache_info'):
+        return None
+    info = resize_plan.cache_info()
+    return "%i hits, %i misses, %i of %i plans cached" % (info.hits,
+                                                          info.misses,
+                                                          info.currsize,
+                                                          info.maxsize)
+
+def numpy_resize(image, dimensions, interpolation=interpol.default):
+    """ Resize an image with a separable filter, applied first to its rows
+        and then its columns, by way of NumPy matrix products -- using the
+        same filters as Pillow, rounding to 8 bits after each pass, and
+        premultiplying alpha, as Pillow does (unless the image is entirely
+        opaque). Image modes and interpolation methods that this doesn’t
+        cover get passed along to `pillow_resize(…)`.
+    """
+    if image.mode not in numpy_resize.modes or \
+       interpol(interpolation) not in numpy_resize.filters:
+        return pillow_resize(image, dimensions, interpolation)
+    vertical, horizontal = resize_plan(image.size, tuple(dimensions), interpolation)
+    pixels = numpy.array(image, dtype=numpy.float64)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, numpy.newaxis]
+    alpha = image.mode in ('LA', 'RGBA') and pixels[..., -1].min() < 255.0
+    if alpha:
+        pixels[..., :-1] = numpy.floor(pixels[..., :-1] * pixels[..., -1:] / 255.0 + 0.5)
+    if horizontal is not None:
+        pixels = numpy.tensordot(pixels, horizontal, axes=(1, 1)).transpose(0, 2, 1)
+        pixels = numpy.clip(numpy.floor(pixels + 0.5), 0, 255)
+    if vertical is not None:
+        pixels = numpy.tensordot(vertical, pixels, axes=(1, 0))
+        pixels = numpy.clip(numpy.floor(pixels + 0.5), 0, 255)
+    if alpha:
+        opacity = pixels[..., -1:]
+        pixels[..., :-1] = numpy.where((opacity > 0.0) & (opacity < 255.0),
+                                       numpy.floor(pixels[..., :-1] * 255.0 / numpy.maximum(opacity, 1.0)),
+                                       pixels[..., :-1])
+    pixels = numpy.clip(pixels, 0, 255).astype(numpy.uint8)
+    if pixels.shape[2] == 1:
+        pixels = pixels[:, :, 0]
+    return Image.fromarray(numpy.ascontiguousarray(pixels), mode=image.mode)
+
+def hamming_filter(x):
+    x = numpy.abs(x)
+    return numpy.where(x < 1.0, numpy.sinc(x) * (0.54 + 0.46 * numpy.cos(numpy.pi * x)), 0.0)
+
+def bicubic_filter(x, a=-0.5):
+    x = numpy.abs(x)
+    return numpy.where(x < 1.0, ((a + 2.0) * x - (a + 3.0)) * x * x + 1.0,
+           numpy.where(x < 2.0, (((x - 5.0) * x + 8.0) * x - 4.0) * a, 0.0))
+
+def lanczos_filter(x):
+    return numpy.where(numpy.abs(x) < 3.0, numpy.sinc(x) * numpy.sinc(x / 3.0), 0.0)
+
+# the filters `numpy_resize(…)` knows, as (support, function) tuples,
+# keyed by their PIL/Pillow interpolation constants:
+numpy_resize.filters = {
+    Image.BOX       : (0.5, lambda x: ((x > -0.5) & (x <= 0.5)) * 1.0),
+    Image.BILINEAR  : (1.0, lambda x: numpy.maximum(1.0 - numpy.abs(x), 0.0)),
+    Image.HAMMING   : (1.0, hamming_filter),
+    Image.BICUBIC   : (2.0, bicubic_filter),
+    Image.LANCZOS   : (3.0, lanczos_filter) }
+
+# the image modes `numpy_resize(…)` knows:
+numpy_resize.modes = frozenset({ 'L', 'LA', 'RGB', 'RGBA' })
+
+# the resampling backends, by name -- “numpy” only if NumPy is installed:
+resize.backends = { 'pillow' : pillow_resize }
+if numpy is not None:
+    resize.backends['numpy'] = numpy_resize
+
+# the default resampling backend:
+resize.default = "pillow"
+
+# the backends that make use of `resize_plan(…)` -- Pillow computes its
+# coefficients internally, and can’t be handed any precomputed ones:
+resize.planned = frozenset({ "numpy" })
+
+def scaler(image, factor=2, interpolation=interpol.default, backend=None,
+                                                            verbose=False):
     """ Scale an image by a numeric (int or float) factor """
     width, height = image.size
     dim_scaler = sizer(factor)
@@ -149,57 +415,561 @@ def scaler(image, factor=2, interpolation=interpol.default, verbose=False):
               width, height,
               factor,
               interpolation))
-    return image.resize(new_size, interpol(interpolation))
+    return resize(image, new_size, interpolation, backend=backend)
 
 def intify(size):
     """ Convert a size descriptor (e.g. 1x, 2x, 3x) to an integer """
     return int(size[0])
 
+def magnitude(size):
+    """ Convert a size descriptor (e.g. 1x, 2x, 3x) or an Android density
+        (e.g. mdpi, xhdpi) to its scale factor, as a float
+    """
+    if size in densities:
+        return densities[size]
+    return float(intify(size))
+
 def scale(size, denominator_size):
     """ Compute a scaling factor from two size descriptors """
-    denominator = intify(denominator_size)
-    if denominator == 1:
-        return intify(size)
-    return float(intify(size)) / float(denominator)
+    return magnitude(size) / magnitude(denominator_size)
 
-def generate(image, size, interpolation=interpol.default, verbose=False):
-    """ Generate a full set of sized images – 1x/2x/3x – from a source
-        image, whose scale factor is specified by a size descriptor
+def reduction(image, dimensions):
+    """ Return the integer divisor with which ‘PIL.Image.Image.reduce(…)’
+        would shrink an image to exactly the given dimensions -- or None,
+        if there is no such divisor
     """
-    target_sizes = sizes - { size }
+    width, height = image.size
+    new_width, new_height = dimensions
+    if new_width < 1 or new_height < 1 or width % new_width:
+        return None
+    divisor = width // new_width
+    if divisor < 2 or height != divisor * new_height:
+        return None
+    return divisor
+
+def downscaler(levels, size, new_size,
+               interpolation=interpol.default,
+               downscaling="direct",
+               backend=None,
+               verbose=False):
+    """ Downscale an image to a new size descriptor, using one of the
+        already-generated “levels” -- a dictionary of sized images, as
+        returned by `generate(…)` sub., in which “size” is the source:
+        
+        • “direct” resizes the source image, as `scaler(…)` does;
+        • “pyramid” resizes the next-largest level -- e.g. 3x → 2x → 1x;
+        • “reduce” uses ‘PIL.Image.Image.reduce(…)’ -- a fast box filter --
+          on the largest level that divides evenly into the new size, e.g.
+          3x → 1x or 2x → 1x, falling back to resizing the source image.
+        
+        Either way, only the source and the levels below it are candidates;
+        levels that were scaled up from the source are never used.
+        
+        The dimensions of the result are always those that resizing the
+        source image directly would produce.
+    """
+    image = levels[size]
+    dim_scaler = sizer(scale(new_size, size))
+    dimensions = (dim_scaler(image.width),
+                  dim_scaler(image.height))
+    # Only levels that were scaled down from the source are fit to derive
+    # from -- an upscaled level has no more detail than the source has:
+    larger = sorted((level for level in levels \
+                           if magnitude(new_size) < magnitude(level) <= magnitude(size)),
+                    key=magnitude)
+    if downscaling == "pyramid":
+        level = larger[0]
+        if verbose:
+            print("» Rescaling %s level to %s x %s with method “%s”" % (
+                  level, dimensions[0], dimensions[1],
+                  interpolation))
+        return resize(levels[level], dimensions, interpolation, backend=backend)
+    if downscaling == "reduce":
+        for level in reversed(larger):
+            divisor = reduction(levels[level], dimensions)
+            if divisor is not None:
+                if verbose:
+                    print("» Reducing %s level by factor %i" % (level, divisor))
+                return levels[level].reduce(divisor)
+    return scaler(image, verbose=verbose,
+                         interpolation=interpolation,
+                         backend=backend,
+                         factor=scale(new_size, size))
+
+# the names of the methods `downscaler(…)` knows about:
+downscaler.methods = frozenset({ "direct", "pyramid", "reduce" })
+
+# the default downscaling method:
+downscaler.default = "direct"
+
+def generate(image, size, targets=None,
+                          interpolation=interpol.default,
+                          downscaling=downscaler.default,
+                          backend=None,
+                          verbose=False):
+    """ Generate a full set of sized images – 1x/2x/3x, or whichever target
+        sizes and densities are given – from a source image, whose scale
+        factor is specified by a size descriptor, returning a dictionary
+        keyed by target. Smaller sizes are generated largest-first, so that
+        they may be derived from one another, q.v. `downscaler(…)` supra. --
+        and targets with the same scale factor (e.g. 2x and xhdpi) share the
+        very same image, so mind closing each of them just the once; q.v.
+        `close_images(…)` sub.
+    """
+    target_sizes = frozenset(targets or sizes)
     out = { size : image }
     image.load()
-    for new_size in sorted(target_sizes):
-        out[new_size] = scaler(image, verbose=verbose,
-                                      interpolation=interpolation,
-                                      factor=scale(new_size, size))
-    return out
+    for new_size in sorted(target_sizes - { size }, key=lambda target: (magnitude(target), target),
+                                                    reverse=True):
+        shared = [level for level in out if magnitude(level) == magnitude(new_size)]
+        if shared:
+            if verbose:
+                print("» Sharing %s level for %s" % (shared[0], new_size))
+            out[new_size] = out[shared[0]]
+        elif magnitude(new_size) < magnitude(size):
+            out[new_size] = downscaler(out, size, new_size,
+                                       interpolation=interpolation,
+                                       downscaling=downscaling,
+                                       backend=backend,
+                                       verbose=verbose)
+        else:
+            out[new_size] = scaler(image, verbose=verbose,
+                                          interpolation=interpolation,
+                                          backend=backend,
+                                          factor=scale(new_size, size))
+    return dict((target, out[target]) for target in target_sizes)
+
+def close_images(images):
+    """ Close each of a sequence of PIL images -- each only once, as the
+        same image may well turn up more than once, q.v. `generate(…)` supra.
+    """
+    for image in dict((id(image), image) for image in images).values():
+        image.close()
 
-def ensure_path_is_valid(pth):
-    """ Raise an exception if we can’t write to the specified path """
+def decode(source, largest=None, interpolation=interpol.default,
+                                 backend=None,
+                                 verbose=False):
+    """ Open and decode a source image -- scaling it down, if it is larger
+        than “largest” pixels on a side, so that it is no larger than that.
+        The source may be a path, a file-like object, a bytes object with
+        the images’ encoded data, or a PIL image (which gets copied).
+        
+        Oversized JPEGs are decoded at a reduced resolution, by way of
+        ‘PIL.Image.Image.draft(…)’, which has libjpeg do most of the work
+        of downscaling as it decodes; other formats are fully decoded, and
+        then shrunk by the largest integer factor that still leaves them at
+        least as large as called for, with ‘PIL.Image.Image.reduce(…)’ --
+        either way, what’s left is resized to the exact dimensions with the
+        given interpolation method.
+    """
+    if isinstance(source, Image.Image):
+        image = source.copy()
+    else:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        image = Image.open(source)
+    if not largest or max(image.size) <= largest:
+        image.load()
+        return image
+    factor = float(largest) / max(image.size)
+    dimensions = (max(int(factor * image.width), 1),
+                  max(int(factor * image.height), 1))
+    if image.format == 'JPEG':
+        width, height = image.size
+        image.draft(image.mode, dimensions)
+        if verbose:
+            print("» Decoding %s x %s JPEG at %s x %s" % (
+                  width, height,
+                  image.width, image.height))
+    image.load()
+    divisor = min(image.width // dimensions[0],
+                  image.height // dimensions[1])
+    if divisor > 1:
+        if verbose:
+            print("» Reducing decoded %s x %s image by factor %i" % (
+                  image.width, image.height,
+                  divisor))
+        reduced = image.reduce(divisor)
+        image.close()
+        image = reduced
+    if image.size != dimensions:
+        if verbose:
+            print("» Rescaling %s x %s image to %s x %s with method “%s”" % (
+                  image.width, image.height,
+                  dimensions[0], dimensions[1],
+                  interpolation))
+        resized = resize(image, dimensions, interpolation, backend=backend)
+        image.close()
+        image = resized
+    return image
+
+def difference(image, reference):
+    """ Compute the RMS difference between two images of the same size,
+        over all bands, and the corresponding PSNR in decibels
+    """
+    from PIL import ImageChops, ImageStat
+    if image.mode != reference.mode:
+        image = image.convert(reference.mode)
+    bands = ImageStat.Stat(ImageChops.difference(image, reference)).rms
+    rms = math.sqrt(sum(band * band for band in bands) / len(bands))
+    psnr = rms and 20.0 * math.log10(255.0 / rms) or float('inf')
+    return rms, psnr
+
+def benchmark(source_paths, size, variants, reference=None, repeat=3):
+    """ Time `generate(…)` on a set of source images, once for each of the
+        variants -- a dictionary of `generate(…)` keyword arguments, keyed
+        by name -- taking the best of “repeat” runs per image, not counting
+        decoding; and measure how far the output of each variant strays from
+        that of the “reference” keyword arguments. Returns a dictionary of
+        results keyed by variant name.
+    """
+    reference = reference or {}
+    seconds = dict.fromkeys(variants, 0.0)
+    squares = dict.fromkeys(variants, 0.0)
+    compared = 0
+    pixels = 0
+    for source_path in source_paths:
+        image = Image.open(source_path)
+        references = generate(image, size, **reference)
+        for name, arguments in variants.items():
+            timings = []
+            for _ in range(max(repeat, 1)):
+                started = time.time()
+                outputs = generate(image, size, **arguments)
+                timings.append(time.time() - started)
+            seconds[name] += min(timings)
+            for new_size, output in outputs.items():
+                if new_size != size:
+                    rms, _ = difference(output, references[new_size])
+                    squares[name] += rms * rms
+                    output.close()
+        for new_size, reference_image in references.items():
+            if new_size != size:
+                compared += 1
+                pixels += reference_image.width * reference_image.height
+                reference_image.close()
+        image.close()
+    results = {}
+    for name in variants:
+        rms = math.sqrt(squares[name] / max(compared, 1))
+        results[name] = { 'seconds' : seconds[name],
+                           'pixels' : pixels,
+                              'rms' : rms,
+                             'psnr' : rms and 20.0 * math.log10(255.0 / rms) \
+                                          or float('inf') }
+    return results
+
+def benchmark_downscaling(source_paths, size,
+                          interpolation=interpol.default,
+                          methods=None,
+                          repeat=3):
+    """ Benchmark each downscaling method on a set of source images against
+        the “direct” method, q.v. `benchmark(…)` supra.
+    """
+    variants = dict((method, { 'interpolation' : interpolation,
+                                 'downscaling' : method }) \
+                     for method in (methods or downscaler.methods))
+    return benchmark(source_paths, size, variants,
+                     reference={ 'interpolation' : interpolation },
+                     repeat=repeat)
+
+def benchmark_backends(source_paths, size,
+                       interpolation=interpol.default,
+                       backends=None,
+                       repeat=3):
+    """ Benchmark each resampling backend on a set of source images against
+        the “pillow” backend, q.v. `benchmark(…)` supra.
+    """
+    variants = dict((backend, { 'interpolation' : interpolation,
+                                      'backend' : backend }) \
+                     for backend in (backends or resize.backends))
+    return benchmark(source_paths, size, variants,
+                     reference={ 'interpolation' : interpolation },
+                     repeat=repeat)
+
+def ensure_path_is_valid(pth, overwrite=False):
+    """ Raise an exception if we can’t write to the specified path --
+        an existing file is OK if “overwrite” is True
+    """
     if os.path.exists(pth):
         if os.path.isdir(pth):
             raise FilesystemError("Can’t save over directory: %s" % pth)
-        raise FilesystemError("Output file exists: %s" % pth)
+        if not overwrite:
+            raise FilesystemError("Output file exists: %s" % pth)
     parent_dir = os.path.dirname(pth)
     if not os.path.isdir(parent_dir):
         raise FilesystemError("Directory doesn’t exist: %s" % parent_dir)
 
-def save(image, pth, verbose=False):
-    """ Save a PIL image object to a specified path """
-    ensure_path_is_valid(pth)
-    image.save(pth, **save.options)
+class WriteBehind(object):
+    
+    """ A write-behind stage for output files: data handed to `write(…)`
+        is written out by a background thread, by way of a bounded queue --
+        so that encoding the next image overlaps writing the last one, which
+        makes all the difference on network-mounted asset directories -- and
+        everything written gets fsync’d in one go, along with the directories
+        it was written to, when the stage is closed.
+    """
+    
+    def __init__(self, maxsize=4, fsync=True):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.fsync = fsync
+        self.written = []
+        self.error = None
+        self.thread = threading.Thread(target=self.run,
+                                       name="asscat-write-behind")
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is None:
+                pth, data = item
+                try:
+                    with open(pth, "wb") as handle:
+                        handle.write(data)
+                except (IOError, OSError) as exc:
+                    self.error = exc
+                else:
+                    self.written.append(pth)
+    
+    def write(self, pth, data):
+        """ Queue data to be written to a path -- blocking while the queue is
+            full, and raising any error the writer thread ran into so far
+        """
+        if self.error is not None:
+            raise FilesystemError("Couldn’t write output file: %s" % self.error)
+        self.queue.put((pth, data))
+    
+    def sync(self):
+        """ Flush everything written so far to disk, along with the
+            directories it was written to, returning the number of files --
+            raising (and recording) the first error any of the files ran
+            into. Directories on filesystems that can’t fsync them are fine.
+        """
+        directories = sorted(set(os.path.dirname(pth) for pth in self.written))
+        for pth in self.written + directories:
+            try:
+                fd = os.open(pth, os.O_RDONLY)
+            except (IOError, OSError) as exc:
+                if pth in directories:
+                    continue
+                self.error = self.error or exc
+                continue
+            try:
+                os.fsync(fd)
+            except (IOError, OSError) as exc:
+                if pth not in directories or exc.errno not in (errno.EINVAL, errno.ENOTSUP):
+                    self.error = self.error or exc
+            finally:
+                os.close(fd)
+        if self.error is not None:
+            raise FilesystemError("Couldn’t sync output file: %s" % self.error)
+        return len(self.written)
+    
+    def close(self):
+        """ Wait for everything queued to be written, and fsync it all --
+            raising any error the writer thread ran into
+        """
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            if self.fsync and self.error is None:
+                self.sync()
+        if self.error is not None:
+            raise FilesystemError("Couldn’t write output file: %s" % self.error)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        # Don’t mask an exception already in flight with one of our own:
+        try:
+            self.close()
+        except FilesystemError:
+            if exc_type is None:
+                raise
+        return False
+
+def encode(image, profile=None, format=None):
+    """ Encode a PIL image object in memory, returning the encoded bytes,
+        using the options from a named encode profile -- or those in
+        `save.options`, if no profile name is given; q.v. `save(…)` sub.
+        Formats other than PNG take their options from `save.formats`.
+    """
+    if format in (None, save.format):
+        options = profile and save.profiles[profile] or save.options
+    else:
+        options = save.formats[format][profile or save.default]
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+def save(image, pth, overwrite=False, profile=None, format=None, writer=None,
+                                                                 verbose=False):
+    """ Save a PIL image object to a specified path, using the options
+        from a named encode profile -- q.v. `save.profiles` sub. -- or
+        those in `save.options`, if no profile name is given, in a named
+        output format (PNG by default). The encoded image is handed off to
+        a `WriteBehind` stage, if one is given.
+    """
+    ensure_path_is_valid(pth, overwrite=overwrite)
+    started = time.time()
+    data = encode(image, profile=profile, format=format)
+    elapsed = time.time() - started
+    if writer is None:
+        with open(pth, "wb") as handle:
+            handle.write(data)
+    else:
+        writer.write(pth, data)
     image_file = os.path.basename(pth)
     if verbose:
-        statbuf = os.lstat(pth)
-        print("» Wrote %i bytes to image file %s" % (statbuf.st_size,
-                                                          image_file))
+        print("» Encoded %i bytes for image file %s in %0.3fs (%s, profile “%s”)" % (
+              len(data),
+              image_file,
+              elapsed,
+              (format or save.format).upper(),
+              profile or save.default))
     return image_file
 
-# PIL Image.save(…) arguments -- options specifying image file output:
-save.options = { 'compress_level' : 9,
-                       'optimize' : True,
-                         'format' : 'png' }
+# PIL Image.save(…) arguments -- options specifying image file output --
+# in named encode profiles, from the fastest to the smallest:
+save.profiles = {
+    'fast'      : { 'compress_level' : 1,
+                          'optimize' : False,
+                            'format' : 'png' },
+    'balanced'  : { 'compress_level' : 6,
+                          'optimize' : False,
+                            'format' : 'png' },
+    'archival'  : { 'compress_level' : 9,
+                          'optimize' : True,
+                            'format' : 'png' } }
+
+# the default encode profile, and its options:
+save.default = "archival"
+save.options = save.profiles[save.default]
+
+# the default output format:
+save.format = "png"
+
+# PIL Image.save(…) arguments for each output format, in encode profiles
+# of the same names -- WebP is lossless, like PNG, with “quality” standing
+# in for effort; AVIF is lossy, at the same quality and with full-resolution
+# chroma throughout, with only the encoder speed varying:
+save.formats = {
+    'png'       : save.profiles,
+    'webp'      : { 'fast'      : { 'lossless' : True,
+                                     'quality' : 0,
+                                      'method' : 0,
+                                      'format' : 'webp' },
+                    'balanced'  : { 'lossless' : True,
+                                     'quality' : 50,
+                                      'method' : 4,
+                                      'format' : 'webp' },
+                    'archival'  : { 'lossless' : True,
+                                     'quality' : 100,
+                                      'method' : 6,
+                                      'format' : 'webp' } },
+    'avif'      : { 'fast'      : { 'quality' : 90,
+                                      'speed' : 10,
+                                'subsampling' : '4:4:4',
+                                     'format' : 'avif' },
+                    'balanced'  : { 'quality' : 90,
+                                      'speed' : 6,
+                                'subsampling' : '4:4:4',
+                                     'format' : 'avif' },
+                    'archival'  : { 'quality' : 90,
+                                      'speed' : 2,
+                                'subsampling' : '4:4:4',
+                                     'format' : 'avif' } } }
+
+def encodable(format):
+    """ Can the installed PIL/Pillow encode images in the named format? """
+    if format == save.format:
+        return True
+    try:
+        from PIL import features
+        return bool(features.check(format))
+    except (ImportError, ValueError):
+        return False
+
+def recompress(paths, profile="archival", cancelled=None, verbose=False):
+    """ Re-encode a list of already-written image files in place, using
+        the options from a named encode profile -- by way of temporary
+        files, and keeping only those re-encodings that come out smaller.
+        Files that change while they’re being re-encoded (as when the next
+        build in watch mode rewrites them) are left alone. Pass an event
+        as “cancelled” to stop early, between one file and the next.
+        Returns the total number of bytes saved.
+    """
+    options = save.profiles[profile]
+    saved = 0
+    for pth in paths:
+        if cancelled is not None and cancelled.is_set():
+            break
+        try:
+            stat = os.lstat(pth)
+        except OSError:
+            continue
+        temporary = "%s.%i" % (pth, os.getpid())
+        image = Image.open(pth)
+        try:
+            image.load()
+            image.save(temporary, **options)
+        finally:
+            image.close()
+        try:
+            current = os.lstat(pth)
+        except OSError:
+            current = None
+        before, after = stat.st_size, os.lstat(temporary).st_size
+        if current is None or (current.st_size, current.st_mtime) != \
+                                 (stat.st_size, stat.st_mtime):
+            os.unlink(temporary)
+            continue
+        if after < before:
+            os.rename(temporary, pth)
+            saved += before - after
+        else:
+            os.unlink(temporary)
+        if verbose:
+            print("» Recompressed %s: %i → %i bytes" % (os.path.basename(pth),
+                                                        before, min(before, after)))
+    return saved
+
+# the background recompression process, if any, and its cancellation
+# event -- there is only ever the one, q.v. `recompress_in_background(…)`:
+recompress.process = None
+recompress.cancelled = None
+
+def recompress_in_background(paths, profile="archival"):
+    """ Start recompressing a list of image files in a separate process,
+        q.v. `recompress(…)` supra. -- first cancelling, and waiting on,
+        any recompression still running from a previous build.
+        Returns the new process.
+    """
+    recompress_finish(cancel=True)
+    recompress.cancelled = multiprocessing.Event()
+    recompress.process = multiprocessing.Process(target=recompress,
+                                                 args=(paths, profile),
+                                                 kwargs=dict(cancelled=recompress.cancelled))
+    recompress.process.start()
+    return recompress.process
+
+def recompress_finish(cancel=False):
+    """ Wait for the background recompression process, if there is one,
+        to exit -- with “cancel”, it stops after the file it’s working on
+    """
+    if recompress.process is None:
+        return
+    if cancel:
+        recompress.cancelled.set()
+    recompress.process.join()
+    recompress.process = None
+    recompress.cancelled = None
 
 def to_json(dictionary):
     """ Encode a Python dict as a JSON dictionary, using the same
@@ -212,6 +982,18 @@ to_json.options = { 'separators' : (',', ' : '),
                      'sort_keys' : True,
                         'indent' : 4 }
 
+def compact(doc):
+    """ Collapse each “[ -x ARG | --long=ARG ]” group in a docopt usage
+        pattern down to “[ -x ARG ]” -- docopt treats the short and long
+        forms of an option as synonyms anyway, but expands every “|” into
+        separate branches before matching, so its parsing time otherwise
+        doubles with each and every option added to the usage pattern
+    """
+    return compact.alternation_re.sub("]", doc)
+
+# Regular expression matching the long-form half of an optional group:
+compact.alternation_re = re.compile(r"\|\s+--[\w-]+(?:=[A-Z]+)?\s+\]")
+
 def keyed(function):
     """ Assign an attribute “key” to a target function derived
         from that functions’ name – if the function has the name
@@ -245,6 +1027,11 @@ def show_valid_sizes():
     print()
     for size in sorted(sizes):
         print("» “%s” – ∫cale ƒactor %i" % (size, intify(size)))
+    print()
+    print("» TOTAL VALID ANDROID DENSITY TARGETS: %i" % len(densities))
+    print()
+    for density in sorted(densities, key=magnitude):
+        print("» “%s” – ∫cale ƒactor %0.1f" % (density, magnitude(density)))
 
 @keyed
 def show_interpolation_methods():
@@ -268,66 +1055,65 @@ def show_interpolation_methods():
 
 @keyed
 def show_save_options():
-    """ Print the output image `save.options` dictionary, as passed to
-       ‘PIL.Image.Image.save(…)’ internally, formatted in a human-readable
-        fashion, before exiting.
+    """ Print the output image options for each encode profile in the
+        `save.profiles` dictionary, as passed to ‘PIL.Image.Image.save(…)’
+        internally, formatted in a human-readable fashion, before exiting --
+        followed by those for the other formats, q.v. `save.formats`.
+    """
+    print("» OUTPUT IMAGE SAVE OPTIONS, BY ENCODE PROFILE: %i" % len(save.profiles))
+    for profile, options in sorted(save.profiles.items(),
+                                   key=lambda item: item[1]['compress_level']):
+        print()
+        print("» “%s” %s" % (profile, profile == save.default and '» (default)' or ''))
+        print(to_json(options))
+        for format in sorted(set(save.formats) - { save.format }):
+            print("» “%s” as %s %s" % (profile, format.upper(),
+                                       not encodable(format) and '» (unsupported)' or ''))
+            print(to_json(save.formats[format][profile]))
+
+def show_benchmark(title, results, default, source_paths, size, interpolation):
+    """ Print the results of `benchmark(…)` to STDOUT -- the time each variant
+        took, relative to that of the default, its throughput in megapixels
+        (of output) per second, and the RMS difference of its output from that
+        of the reference, with the corresponding PSNR
     """
-    print("» OUTPUT IMAGE SAVE OPTIONS:")
+    baseline = results[default]['seconds'] or 1.0
+    print("» %s BENCHMARK: %i source images at %s, with method “%s”" % (
+          title, len(source_paths), size, interpolation))
     print()
-    print(to_json(save.options))
+    for name, result in sorted(results.items()):
+        print("» “%s” – %0.3fs (%0.2fx, %0.1f Mpx/s) – RMS error %0.3f, PSNR %0.1f dB %s" % (
+              name,
+              result['seconds'],
+              baseline / (result['seconds'] or 1.0),
+              result['pixels'] / (result['seconds'] or 1.0) / 1e6,
+              result['rms'],
+              result['psnr'],
+              name == default and '» (default)' or ''))
+
+def show_downscaling_benchmark(source_paths, size, interpolation=interpol.default):
+    """ Print the results of `benchmark_downscaling(…)` for a set of source
+        images to STDOUT, q.v. `show_benchmark(…)` supra.
+    """
+    show_benchmark("DOWNSCALING",
+                   benchmark_downscaling(source_paths, size, interpolation=interpolation),
+                   downscaler.default, source_paths, size, interpolation)
+
+def show_backend_benchmark(source_paths, size, interpolation=interpol.default):
+    """ Print the results of `benchmark_backends(…)` for a set of source
+        images to STDOUT, q.v. `show_benchmark(…)` supra.
+    """
+    show_benchmark("RESAMPLING BACKEND",
+                   benchmark_backends(source_paths, size, interpolation=interpolation),
+                   resize.default, source_paths, size, interpolation)
 
 def sanitize(text):
-    """ Remove specific unicode strings, in favor of ASCII-friendly versions """
-    sanitized = unicode(text)
-    for sanitizer, substitution in sanitize.sanitizers:
-        sanitized, _ = sanitizer.subn(substitution, sanitized)
-    return sanitized
-
-# Regular expression compiler shortcut:
-sanitize.re = lambda string: re.compile(string, re.MULTILINE)
-
-# Sanitization regexes and their replacement strings:
-sanitize.sanitizers = (
-    (sanitize.re(r"[“”]"),              '"'),
-    (sanitize.re(r"[‘’]"),              "'"),
-    (sanitize.re(r"[«»]"),              ":"),
-    (sanitize.re(r"[äáª]"),             "a"),
-    (sanitize.re(r"[ëé]"),              "e"),
-    (sanitize.re(r"[ïí]"),              "i"),
-    (sanitize.re(r"[öóº]"),             "o"),
-    (sanitize.re(r"[üú]"),              "u"),
-    (sanitize.re(r"‽"),                 "?!"),
-    (sanitize.re(r"¡"),                 "!"),
-    (sanitize.re(r"¿"),                 "?"),
-    (sanitize.re(r"±"),                 "+/-"),
-    (sanitize.re(r"÷"),                 "/"),
-    (sanitize.re(r"•"),                 "*"),
-    (sanitize.re(r"ˆ"),                 "^"),
-    (sanitize.re(r"†"),                 "<*>"),
-    (sanitize.re(r"‡"),                 "<**>"),
-    (sanitize.re(r"§"),                 "$"),
-    (sanitize.re(r"¥"),                 "Y"),
-    (sanitize.re(r"¢"),                 "c"),
-    (sanitize.re(r"ƒ"),                 "f"),
-    (sanitize.re(r"∫"),                 "S"),
-    (sanitize.re(r"ß"),                 "ss"),
-    (sanitize.re(r"ﬂ"),                 "fl"),
-    (sanitize.re(r"ﬁ"),                 "fi"),
-    (sanitize.re(r"£"),                 "lb."),
-    (sanitize.re(r""),                 "Apple"),
-    (sanitize.re(r"⌘"),                 "command"),
-    (sanitize.re(r"∞"),                 "infinity"),
-    (sanitize.re(r'√(?P<arg>[\w\d]*)'), 'sqrt(\g<arg>)'),
-    (sanitize.re(r"¶"),                 "[P]"),
-    (sanitize.re(r"[∂∆]"),              "d"),
-    (sanitize.re(r"Ø"),                 "0"),
-    (sanitize.re(r"→"),                 "->"),
-    (sanitize.re(r"¬"),                 "-]"),
-    (sanitize.re(r"…"),                 "..."),
-    (sanitize.re(r"©"),                 "(c)"),
-    (sanitize.re(r"®"),                 "(r)"),
-    (sanitize.re(r"™"),                 "(tm)"),
-    (sanitize.re(r"—"),                 "-"))
+    """ Remove specific unicode strings, in favor of ASCII-friendly versions --
+        q.v. the “xcode-help” rule set in `replsanitize`, which is only
+        imported if and when this is first called upon
+    """
+    from replsanitize import rulesets
+    return rulesets['xcode-help'](text)
 
 @keyed
 def show_sanitized_help():
@@ -339,10 +1125,12 @@ def show_sanitized_version():
     """ Print the version string, without any bothersomely high codepoints """
     print(sanitize(VERSION))
 
-def filename_with_size(filename, size):
+def filename_with_size(filename, size, format=None):
     """ Compute an output filename for a size descriptor, using
         a given size descriptor and a source filename, with the
         format specified in the `save.options` settings dictionary
+        (or the one given). Android densities go in subfolders --
+        e.g. “drawable-xhdpi/icon.png” -- as Android would have it.
     """
     base, ext = os.path.splitext(filename)
     newname = base
@@ -356,21 +1144,24 @@ def filename_with_size(filename, size):
         if matcher.search(base):
             newname = matcher.sub("", base)
             break
-    newname += "@%s.%s" % (size, save.options.get('format'))
+    extension = format or save.options.get('format')
+    if size in densities:
+        return os.path.join("drawable-%s" % size, "%s.%s" % (newname, extension))
+    newname += "@%s.%s" % (size, extension)
     return newname
 
 # tuple of regexes for matching our size descriptors in filenames:
 filename_with_size.matchers = tuple(re.compile(r"@%s" % size) \
                                                     for size in sorted(sizes))
 
-def output_path_with_size(input_path, output_dir, size):
+def output_path_with_size(input_path, output_dir, size, format=None):
     """ Compute a destination image filename, including size, using the
         source images’ path, the destination directory, and the destination
-        target images’ size descriptor
+        target images’ size descriptor and (optionally) format
     """
     return os.path.join(output_dir, filename_with_size(
                                     os.path.basename(input_path),
-                                    size))
+                                    size, format))
 
 CATALOG_NAME_DEFAULT = "Assets"
 
@@ -395,25 +1186,43 @@ def json_file_path(input_path):
     """ Derive a path for a JSON file from an output directory """
     return os.path.join(os.path.abspath(input_path), JSON_FILENAME)
 
+def stub_contents():
+    """ Get the stub dictionary for an asset catalogs’ root-level metadata
+        file – consisting only of an “info” entry """
+    return { 'info' : JSON_INFO }
+
 def stub_json():
     """ Get the stub dictionary for an asset catalogs’ root-level metadata
         file – consisting only of an “info” entry – encoded as a JSON string
         ready for output """
-    return to_json({ 'info' : JSON_INFO })
+    return to_json(stub_contents())
 
-def namelist_to_json(namelist, verbose=False):
+def namelist_to_contents(namelist, verbose=False):
     """ Transform a list of dictionaries – each dictionary specifying a filename
         (“filename”) and a size descriptor (“scale”) – into the proper structure
-        of an asset catalog metadata dictionary, encode it as JSON, and return
-        this JSON data as a string ready for output """
+        of an asset catalog metadata dictionary – leaving out those that Xcode
+        has no use for, i.e. Android densities and formats other than PNG """
+    extension = ".%s" % save.options.get('format')
+    namelist = [namedict for namedict in namelist \
+                          if namedict['scale'] in sizes \
+                         and os.path.splitext(namedict['filename'])[1] == extension]
     if verbose:
         print("» Assembling metadata catalog for %s entries…" % len(namelist))
     outlist = []
     for namedict in namelist:
-        namedict['idiom'] = 'universal'
-        outlist.append(namedict)
-    return to_json({ 'images' : outlist,
-                       'info' : JSON_INFO })
+        # Copy, rather than clobber, the callers’ dictionaries:
+        outdict = dict(namedict)
+        outdict['idiom'] = 'universal'
+        outlist.append(outdict)
+    return { 'images' : outlist,
+               'info' : JSON_INFO }
+
+def namelist_to_json(namelist, verbose=False):
+    """ Transform a list of dictionaries – each dictionary specifying a filename
+        (“filename”) and a size descriptor (“scale”) – into the proper structure
+        of an asset catalog metadata dictionary, encode it as JSON, and return
+        this JSON data as a string ready for output """
+    return to_json(namelist_to_contents(namelist, verbose=verbose))
 
 if PY3:
     def utf8_encode(source):
@@ -447,19 +1256,663 @@ else:
 
 utf8_encode.encoding = utf8_decode.encoding = sys.getfilesystemencoding().upper() # 'UTF-8'
 
-def write_to_path(data, pth, relative_to=None, verbose=False):
-    """ Write data to a new file using a context-managed handle """
-    ensure_path_is_valid(pth)
+def write_to_path(data, pth, relative_to=None, overwrite=False, writer=None,
+                                                                verbose=False):
+    """ Write data to a new file using a context-managed handle -- or
+        by way of a `WriteBehind` stage, if one is given
+    """
+    ensure_path_is_valid(pth, overwrite=overwrite)
     bytestring = utf8_encode(data)
-    with open(pth, "wb") as handle:
-        handle.write(bytestring)
-        handle.flush()
+    if writer is None:
+        with open(pth, "wb") as handle:
+            handle.write(bytestring)
+            handle.flush()
+    else:
+        writer.write(pth, bytestring)
     if verbose:
         start = relative_to or os.path.dirname(pth)
         print("» Wrote %i bytes to %s" % (len(bytestring),
                                           os.path.relpath(pth,
                                                           start=start)))
 
+def imageset_path(source_path, output_dir, makefolders=False, verbose=False):
+    """ Return the directory into which a source images’ outputs go,
+        creating an imageset subfolder for it if that’s called for
+    """
+    if not makefolders:
+        return output_dir
+    imageset_dir = imageset_folder_name(source_path)
+    output_base_path = os.path.join(output_dir, imageset_dir)
+    if not os.path.isdir(output_base_path):
+        os.makedirs(output_base_path)
+        if verbose:
+            print("» Created imageset subfolder %s" % imageset_dir)
+    return output_base_path
+
+def generate_imageset(source_path, output_dir, size,
+                      targets=None,
+                      formats=None,
+                      interpolation=interpol.default,
+                      downscaling=downscaler.default,
+                      profile=save.default,
+                      largest=None,
+                      backend=None,
+                      makefolders=False,
+                      overwritable=(),
+                      writer=None,
+                      verbose=False):
+    """ Decode, scale and save all the sized images for one source image --
+        in each of the target sizes and formats, from a single decode --
+        closing them all thereafter, and returning a list of dictionaries,
+        one per output file, each with a filename (“filename”) and a size
+        descriptor (“scale”), sorted by size; q.v. `namelist_to_json(…)`.
+        Existing output files are overwritten only if their paths are
+        amongst those in “overwritable”. The images are written out by
+        way of the given `WriteBehind` stage -- or, failing that, one of
+        their own, which is closed (and synced) before returning.
+    """
+    if writer is None:
+        with WriteBehind() as writer:
+            return generate_imageset(source_path, output_dir, size,
+                                     targets=targets,
+                                     formats=formats,
+                                     interpolation=interpolation,
+                                     downscaling=downscaling,
+                                     profile=profile,
+                                     largest=largest,
+                                     backend=backend,
+                                     makefolders=makefolders,
+                                     overwritable=overwritable,
+                                     writer=writer,
+                                     verbose=verbose)
+    output_base_path = imageset_path(source_path, output_dir,
+                                     makefolders=makefolders,
+                                     verbose=verbose)
+    imageset_filenames = []
+    source_image = decode(source_path, largest=largest,
+                                       interpolation=interpolation,
+                                       backend=backend,
+                                       verbose=verbose)
+    output_images = {}
+    try:
+        output_images = generate(source_image, size,
+                                 targets=targets,
+                                 interpolation=interpolation,
+                                 downscaling=downscaling,
+                                 backend=backend,
+                                 verbose=verbose)
+        for new_size, image in sorted(output_images.items()):
+            if verbose:
+                width, height = image.size
+                print("» %s %s: %s x %s" % (source_path, new_size, width, height))
+            for format in (formats or (save.format,)):
+                output_path = output_path_with_size(source_path,
+                                                    output_base_path,
+                                                    new_size, format)
+                if not os.path.isdir(os.path.dirname(output_path)):
+                    os.makedirs(os.path.dirname(output_path))
+                save(image, output_path, overwrite=os.path.abspath(output_path) in overwritable,
+                                         profile=profile,
+                                         format=format,
+                                         writer=writer,
+                                         verbose=verbose)
+                imageset_filenames.append({
+                              'scale'  :  new_size,
+                           'filename'  :  os.path.relpath(output_path, output_base_path) })
+    finally:
+        close_images([source_image] + list(output_images.values()))
+    if verbose:
+        print_plan_cache_info(backend)
+    return imageset_filenames
+
+# the filename for the incremental-build manifest, written alongside
+# the root-level JSON metadata file:
+MANIFEST_FILENAME = ".asscat-manifest.json"
+
+def manifest_file_path(input_path):
+    """ Derive a path for a manifest file from an output directory """
+    return os.path.join(os.path.abspath(input_path), MANIFEST_FILENAME)
+
+def read_manifest(output_dir):
+    """ Read the incremental-build manifest from an output directory --
+        returning an empty manifest if there isn’t one, or it’s unusable
+    """
+    try:
+        with open(manifest_file_path(output_dir), "rb") as handle:
+            manifest = json.loads(utf8_decode(handle.read()))
+    except (IOError, OSError, ValueError):
+        return { 'info' : JSON_INFO, 'sources' : {}, 'contents' : [] }
+    if manifest.get('info') != JSON_INFO:
+        return { 'info' : JSON_INFO, 'sources' : {}, 'contents' : [] }
+    return manifest
+
+def write_manifest(manifest, output_dir, verbose=False):
+    """ Write the incremental-build manifest into an output directory,
+        by way of a temporary file, so as never to leave a partial one
+    """
+    pth = manifest_file_path(output_dir)
+    temporary = "%s.%i" % (pth, os.getpid())
+    with open(temporary, "wb") as handle:
+        handle.write(utf8_encode(to_json(manifest)))
+    os.rename(temporary, pth)
+    if verbose:
+        print("» Wrote manifest for %i sources to %s" % (len(manifest['sources']),
+                                                          MANIFEST_FILENAME))
+
+def digest(pth, blocksize=1 << 20):
+    """ Compute the SHA-256 hex digest of a files’ content """
+    hasher = hashlib.sha256()
+    with open(pth, "rb") as handle:
+        for block in iter(lambda: handle.read(blocksize), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def manifest_options(size, interpolation, downscaling, profile, largest, backend,
+                     makefolders, writejson, targets=None, formats=None):
+    """ The options that, along with a source images’ content, determine its
+        outputs -- any change to these invalidates a manifest entry
+    """
+    formats = formats or (save.format,)
+    return { 'size' : size,
+          'targets' : sorted(targets or sizes),
+          'formats' : list(formats),
+    'interpolation' : interpolation,
+      'downscaling' : downscaling,
+      'makefolders' : makefolders,
+        'writejson' : writejson,
+          'profile' : profile,
+          'largest' : largest,
+          'backend' : backend or resize.default,
+     'save-options' : dict((format, save.formats[format][profile]) for format in formats),
+          'version' : VERSION }
+
+def manifest_entry_is_current(entry, source_digest, options, output_dir):
+    """ Is a manifest entry for the given digest and options, and are
+        all of its outputs still where they were put?
+    """
+    if not entry:
+        return False
+    if entry.get('digest') != source_digest or entry.get('options') != options:
+        return False
+    return all(os.path.isfile(os.path.join(output_dir, output)) \
+                                       for output in entry.get('outputs', []))
+
+def generate_imageset_job(job):
+    """ Unpack a tuple of `generate_imageset(…)` arguments -- for use with
+        the `multiprocessing.Pool.imap(…)` method, q.v. `cli(…)` sub.
+    """
+    source_path, options = job
+    return source_path, generate_imageset(source_path, **options)
+
+def render_imageset(source, name, size,
+                    targets=None,
+                    formats=None,
+                    interpolation=interpol.default,
+                    downscaling=downscaler.default,
+                    profile=save.default,
+                    largest=None,
+                    backend=None,
+                    verbose=False):
+    """ The in-memory counterpart to `generate_imageset(…)` supra.: decode,
+        scale and encode all the sized images for one source image -- a path,
+        a file-like object, some bytes or a PIL image, q.v. `decode(…)` --
+        whose outputs get filenames derived from “name”, as per the source
+        filenames used by `generate_imageset(…)`. Nothing gets written to
+        the filesystem; returns a tuple of a list of filename dictionaries,
+        as per `generate_imageset(…)`, and a dictionary mapping each of those
+        filenames to the encoded image data.
+    """
+    imageset_filenames = []
+    buffers = {}
+    source_image = decode(source, largest=largest,
+                                  interpolation=interpolation,
+                                  backend=backend,
+                                  verbose=verbose)
+    output_images = {}
+    try:
+        output_images = generate(source_image, size,
+                                 targets=targets,
+                                 interpolation=interpolation,
+                                 downscaling=downscaling,
+                                 backend=backend,
+                                 verbose=verbose)
+        for new_size, image in sorted(output_images.items()):
+            for format in (formats or (save.format,)):
+                image_filename = filename_with_size(name, new_size, format)
+                buffers[image_filename] = encode(image, profile=profile,
+                                                        format=format)
+                imageset_filenames.append({
+                              'scale'  :  new_size,
+                           'filename'  :  image_filename })
+    finally:
+        close_images([source_image] + list(output_images.values()))
+    if verbose:
+        print_plan_cache_info(backend)
+    return imageset_filenames, buffers
+
+def render_imageset_job(job):
+    """ Unpack a tuple of `render_imageset(…)` arguments -- for use with
+        the `multiprocessing.Pool.imap(…)` method, q.v. `render(…)` sub.
+    """
+    name, source, options = job
+    return name, render_imageset(source, name, **options)
+
+def render(sources, size="3x",
+           targets=None,
+           formats=None,
+           interpolation=interpol.default,
+           downscaling=downscaler.default,
+           profile=save.default,
+           largest=None,
+           backend=None,
+           makefolders=True,
+           writejson=True,
+           pool=None,
+           verbose=False):
+    """ Generate a whole asset catalog in memory -- the library entry point,
+        for use by long-running processes that would rather not fork off an
+        “asscat.py” for each and every batch of images:
+            
+            images = { "icon.png" : open("icon.png", "rb").read() }
+            catalog = asscat.render(images, size="3x", profile="fast")
+            catalog["icon.imageset/icon@1x.png"]    # PNG data, as bytes
+            catalog["icon.imageset/Contents.json"]  # { 'images' : […], … }
+        
+        * “sources” is a dictionary mapping filenames to source images, each
+          of which may be anything `decode(…)` accepts; a list of paths will
+          do as well. The filenames determine the names of the outputs.
+        
+        * Returns a dictionary mapping relative output paths -- the same ones
+          that `cli(…)` would use, with the same options -- to either bytes,
+          for images, or dictionaries, for the “Contents.json” structures
+          (q.v. `to_json(…)` supra. to encode them as Xcode would).
+        
+        * Pass “targets” -- sizes and Android densities -- and “formats” to
+          render every combination thereof from one decode of each source,
+          as per `generate_imageset(…)` supra.
+        
+        * Pass a `multiprocessing.Pool` to spread the work of rendering
+          imagesets across its worker processes; the pool can be reused
+          from one call to the next.
+    """
+    if not hasattr(sources, 'items'):
+        sources = dict((os.path.basename(source), source) for source in sources)
+    options = dict(size=size,
+                   targets=targets,
+                   formats=formats,
+                   interpolation=interpolation,
+                   downscaling=downscaling,
+                   profile=profile,
+                   largest=largest or None,
+                   backend=backend,
+                   verbose=verbose)
+    job_arguments = ((name, source, options) for name, source in sorted(sources.items()))
+    if pool is not None:
+        results = pool.imap(render_imageset_job, job_arguments)
+    else:
+        results = (render_imageset_job(job) for job in job_arguments)
+    out = {}
+    filenames = []
+    for name, (imageset_filenames, buffers) in results:
+        imageset_dir = makefolders and imageset_folder_name(name) or ""
+        for image_filename, data in buffers.items():
+            out[os.path.join(imageset_dir, image_filename)] = data
+        if writejson:
+            if makefolders:
+                out[os.path.join(imageset_dir, JSON_FILENAME)] = namelist_to_contents(imageset_filenames,
+                                                                                       verbose=verbose)
+            else:
+                filenames.extend(imageset_filenames)
+    if writejson:
+        out[JSON_FILENAME] = makefolders and stub_contents() or namelist_to_contents(filenames,
+                                                                                      verbose=verbose)
+    return out
+
+def expand_sources(paths):
+    """ Expand a list of source paths into a sorted list of source image
+        paths -- any directories in the list stand in for all of the files
+        within them that PIL/Pillow can decode, going by their extensions
+    """
+    extensions = Image.registered_extensions()
+    out = set()
+    for pth in paths:
+        if os.path.isdir(pth):
+            for filename in os.listdir(pth):
+                if os.path.splitext(filename)[1].lower() in extensions:
+                    out.add(os.path.join(pth, filename))
+        else:
+            out.add(pth)
+    return sorted(out)
+
+def build(source_paths, output_dir, size,
+          targets=None,
+          formats=None,
+          interpolation=interpol.default,
+          downscaling=downscaler.default,
+          profile=save.default,
+          largest=None,
+          backend=None,
+          makefolders=False,
+          writejson=False,
+          incremental=False,
+          recompressing=False,
+          relative_to=None,
+          pool=None,
+          verbose=False):
+    """ Generate the imagesets for a list of source images in an output
+        directory, writing out their “Contents.json” metadata as called for --
+        returning the number of source images processed.
+        
+        * In incremental mode, only sources that have changed since the
+          last incremental build are processed -- q.v. `read_manifest(…)`
+          supra. -- and the root-level “Contents.json” file is rewritten
+          only if the set of sources has changed.
+        
+        * Pass a `multiprocessing.Pool` to spread the work of generating
+          imagesets across its worker processes.
+    """
+    opth = output_dir
+    relative_to = relative_to or opth
+    
+    # A recompression left running by the previous build (as in watch mode)
+    # is cancelled before this build gets to rewriting any of its files:
+    
+    recompress_finish(cancel=True)
+    
+    # In incremental mode, the manifest tells us which outputs a previous
+    # build created -- and which may therefore be overwritten:
+    
+    manifest = incremental and read_manifest(opth) or None
+    owned = frozenset()
+    if manifest is not None:
+        owned = frozenset(os.path.abspath(os.path.join(opth, output)) \
+                          for entry in manifest['sources'].values() \
+                          for output in entry.get('outputs', [])) | \
+                frozenset(os.path.abspath(os.path.join(opth, output)) \
+                          for output in manifest.get('contents', []))
+    
+    if writejson:
+        # Raise an error if a JSON file exists, before wasting time doing work
+        # on all the rest of everything else:
+        json_path = json_file_path(opth)
+        if os.path.exists(json_path) and json_path not in owned:
+            raise FilesystemError("JSON metadata file exists: %s" % json_path)
+    
+    # The output pipeline streams through the source images one at a time --
+    # each one is decoded, scaled, saved and closed before the next is even
+    # opened, so memory use doesn’t grow with the number of sources. Metadata
+    # is written out as each imageset completes (or just collected, as a list
+    # of filenames, for a catalog without subfolders):
+    
+    filenames = []
+    processed = 0
+    recompressable = []
+    
+    # With a process pool, each source image gets farmed out to a worker,
+    # from which the results come back in the (sorted) order of the source
+    # paths -- so filenames and Contents.json ordering stay deterministic:
+    
+    options = dict(output_dir=opth, size=size,
+                   targets=targets,
+                   formats=formats,
+                   interpolation=interpolation,
+                   downscaling=downscaling,
+                   profile=profile,
+                   largest=largest or None,
+                   backend=backend,
+                   makefolders=makefolders,
+                   overwritable=owned,
+                   verbose=verbose)
+    
+    # Output files are written behind, by a background thread -- so that
+    # encoding the next image overlaps writing the last one -- and synced
+    # all at once at the end, before the manifest lays claim to any of them.
+    # Pool workers can’t share the writer thread, so they each use their own:
+    
+    writer = WriteBehind()
+    if pool is None:
+        options['writer'] = writer
+    
+    # In incremental mode, sources whose content and options match their
+    # manifest entries are skipped -- the rest are (re)generated. Images
+    # that a previous build wrote are never themselves taken as sources:
+    
+    ipths = [source_path for source_path in source_paths \
+                          if os.path.abspath(source_path) not in owned]
+    built = {}
+    current = {}
+    skipped = 0
+    if manifest is not None:
+        build_options = manifest_options(size, interpolation, downscaling, profile,
+                                         largest or 0, backend,
+                                         makefolders, writejson,
+                                         targets=targets,
+                                         formats=formats)
+        for source_path in ipths:
+            source_digest = digest(source_path)
+            entry = manifest['sources'].get(os.path.basename(source_path))
+            built[source_path] = { 'digest' : source_digest,
+                                  'options' : build_options }
+            if manifest_entry_is_current(entry, source_digest, build_options, opth):
+                current[source_path] = entry
+                skipped += 1
+                if verbose:
+                    print("» Skipping unchanged source image %s" % source_path)
+    
+    job_arguments = ((source_path, options) for source_path in ipths \
+                                             if source_path not in current)
+    
+    if pool is not None:
+        results = pool.imap(generate_imageset_job, job_arguments)
+    else:
+        results = (generate_imageset_job(job) for job in job_arguments)
+    
+    with writer:
+        # This is the primary output loop, iterating over the completed imagesets:
+        
+        for source_path in ipths:
+            if source_path in current:
+                # Unchanged since the last incremental build:
+                if writejson and not makefolders:
+                    filenames.extend(current[source_path]['filenames'])
+                continue
+            generated_path, imageset_filenames = next(results)
+            assert generated_path == source_path
+            processed += 1
+            output_base_path = imageset_path(source_path, opth,
+                                             makefolders=makefolders)
+            outputs = [os.path.join(output_base_path, namedict['filename']) \
+                                                  for namedict in imageset_filenames]
+            recompressable.extend(output for output in outputs \
+                                          if output.endswith(".%s" % save.format))
+            if writejson:
+                if makefolders:
+                    # Write a Contents.json file referencing the image files present
+                    # in the current list of filenames, to the current subfolder:
+                    imageset_json_path = json_file_path(output_base_path)
+                    write_to_path(namelist_to_json(imageset_filenames,
+                                                   verbose=verbose),
+                                  imageset_json_path,
+                                  relative_to=relative_to,
+                                  overwrite=imageset_json_path in owned,
+                                  writer=writer,
+                                  verbose=verbose)
+                    outputs.append(imageset_json_path)
+                else:
+                    # Tack the current list of filenames onto the master list:
+                    filenames.extend(imageset_filenames)
+            if manifest is not None:
+                built[source_path].update({
+                      'outputs' : [os.path.relpath(output, opth) for output in outputs],
+                    'filenames' : imageset_filenames })
+        
+        # Write a Contents.json file, with either:
+        #   1) only the stub JSON (if subfolders were created), or
+        #   2) references to *all* of the generated image files (if we
+        #      eschewed subfolders and wrote everything to one directory)
+        # … unless it’s from an incremental build in which nothing changed.
+        
+        unchanged = manifest is not None and not processed and \
+                    set(manifest['sources']) == set(os.path.basename(source_path) \
+                                                     for source_path in ipths)
+        
+        if writejson and not (unchanged and os.path.isfile(json_file_path(opth))):
+            base_json = makefolders and stub_json() or namelist_to_json(filenames,
+                                                                        verbose=verbose)
+            write_to_path(base_json,
+                          json_file_path(opth),
+                          relative_to=relative_to,
+                          overwrite=json_file_path(opth) in owned,
+                          writer=writer,
+                          verbose=verbose)
+    
+    # Record what was built, for the next incremental build:
+    
+    if manifest is not None and not unchanged:
+        for source_path, entry in current.items():
+            built[source_path] = entry
+        # N.B. sources are keyed by filename, as are their outputs:
+        manifest['sources'] = dict((os.path.basename(source_path), entry) \
+                                    for source_path, entry in built.items())
+        manifest['contents'] = writejson and [JSON_FILENAME] or []
+        write_manifest(manifest, opth, verbose=verbose)
+    
+    if verbose:
+        print("» File I/O complete: %i source images processed, %i skipped." % (processed,
+                                                                               skipped))
+    
+    # Recompress the newly-built images with the “archival” profile, in a
+    # separate process -- the images are all usable as-is in the meantime,
+    # as each one is only replaced (atomically) by a smaller re-encoding:
+    
+    if recompressing and recompressable:
+        recompressor = recompress_in_background(recompressable, "archival")
+        if verbose:
+            print("» Recompressing %i images in the background (pid %i)" % (len(recompressable),
+                                                                            recompressor.pid))
+    
+    return processed
+
+def inotify_waiter(directories, relevant=None):
+    """ Return a function that waits, for up to a given timeout, for files
+        within any of a list of directories to change -- returning True if
+        any did, and False otherwise -- using the Linux inotify(7) API, by
+        way of `ctypes`. Changes to files whose names don’t satisfy the
+        optional “relevant” predicate are ignored. Returns None on systems
+        without inotify.
+    """
+    try:
+        import ctypes, ctypes.util
+        import select, struct
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        inotify_init1 = libc.inotify_init1
+        inotify_add_watch = libc.inotify_add_watch
+    except (ImportError, OSError, AttributeError):
+        return None
+    fd = inotify_init1(os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0))
+    if fd < 0:
+        return None
+    for directory in directories:
+        if inotify_add_watch(fd, utf8_encode(directory), inotify_waiter.mask) < 0:
+            os.close(fd)
+            return None
+    
+    def wait(timeout=None):
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            return False
+        changed = False
+        while True:
+            try:
+                events = os.read(fd, 65536)
+            except (IOError, OSError):
+                break
+            offset = 0
+            while offset < len(events):
+                _, _, _, length = struct.unpack_from("iIII", events, offset)
+                offset += struct.calcsize("iIII")
+                name = utf8_decode(events[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                changed = changed or relevant is None or relevant(name)
+        return changed
+    
+    return wait
+
+# inotify(7) events to watch for -- IN_CLOSE_WRITE, IN_MOVED_FROM,
+# IN_MOVED_TO and IN_DELETE:
+inotify_waiter.mask = 0x008 | 0x040 | 0x080 | 0x200
+
+def polling_waiter(paths, interval=1.0):
+    """ Return a function that waits, for up to a given timeout, for any of
+        the source images in a list of paths -- q.v. `expand_sources(…)`
+        supra. -- to change, by checking their sizes and mtimes every so
+        often, returning True if any did and False otherwise
+    """
+    def state():
+        out = {}
+        for source_path in expand_sources(paths):
+            try:
+                statbuf = os.stat(source_path)
+            except (IOError, OSError):
+                continue
+            out[source_path] = (statbuf.st_size, statbuf.st_mtime)
+        return out
+    
+    last = [state()]
+    
+    def wait(timeout=None):
+        waited = 0.0
+        while timeout is None or waited < timeout:
+            step = timeout is None and interval or min(interval, timeout - waited)
+            time.sleep(step)
+            waited += step
+            now = state()
+            if now != last[0]:
+                last[0] = now
+                return True
+        return False
+    
+    return wait
+
+def watch(paths, callback, debounce=None, interval=None, verbose=False):
+    """ Call `callback()` on the source images in a list of paths, and then
+        again after each burst of changes to them -- waiting until nothing
+        has changed for “debounce” seconds, before each call -- until
+        interrupted. Changes are noticed with inotify where it’s available,
+        and by polling every “interval” seconds elsewhere.
+    """
+    debounce = debounce or watch.debounce
+    interval = interval or watch.interval
+    directories = sorted(set(os.path.isdir(pth) and pth or os.path.dirname(os.path.abspath(pth)) \
+                                                         for pth in paths))
+    names = set(os.path.basename(pth) for pth in paths if not os.path.isdir(pth))
+    extensions = Image.registered_extensions()
+    relevant = lambda name: name in names or \
+                            os.path.splitext(name)[1].lower() in extensions
+    wait = inotify_waiter(directories, relevant=relevant)
+    if wait is None:
+        wait = polling_waiter(paths, interval=interval)
+        if verbose:
+            print("» Polling %i source directories for changes" % len(directories))
+    elif verbose:
+        print("» Watching %i source directories for changes" % len(directories))
+    callback()
+    try:
+        while True:
+            if not wait(None):
+                continue
+            while wait(debounce):
+                pass
+            callback()
+    except KeyboardInterrupt:
+        if verbose:
+            print("» Done watching")
+
+# the default number of seconds to wait for a burst of changes to subside,
+# and the default number of seconds between checks, when polling:
+watch.debounce = 0.5
+watch.interval = 1.0
+
 def cli(argv=None, debug=False):
     """ The primary entry point for the asscat.py command-line tool.
         
@@ -469,8 +1922,9 @@ def cli(argv=None, debug=False):
           of Docopt’s processing – and exit immediately thereafter.
         
         * asscat.py can process any sort of image file that PIL/Pillow
-          is capable of reading; images it generates are always PNGs,
-          as per Xcode’s finicky preferences.
+          is capable of reading; images it generates are PNGs, as per
+          Xcode’s finicky preferences, unless other formats are called
+          for -- in which case only the PNGs make it into the metadata.
         
         * Running asscat.py in verbose mode writes a bunch of messages
           to STDOUT; without specifying verbose mode, a successful run
@@ -484,9 +1938,15 @@ def cli(argv=None, debug=False):
     
     # Get the command-line arguments and flags from Docopt:
     
-    arguments = docopt(__doc__, argv=argv[1:],
-                                help=True,
-                                version=VERSION)
+    arguments = docopt(compact(__doc__), argv=argv[1:],
+                                         help=False,
+                                         version=VERSION)
+    
+    # Help is shown from the original, uncompacted docstring:
+    
+    if arguments.get('--help'):
+        print(__doc__.strip("\n"))
+        raise DisplayAndExit()
     
     # If called with “debug=True”, print argument values and exit immediately:
     
@@ -510,35 +1970,55 @@ def cli(argv=None, debug=False):
     
     # Set up values and defaults for the remaining standard-execution arguments:
     
-    ipths = (utf8_decode(os.path.expanduser(p)) for p in sorted(arguments.get('SOURCE', [])))
+    ipths = [utf8_decode(os.path.expanduser(p)) for p in sorted(arguments.get('SOURCE', []))]
     opth = str(arguments.get('--destination', '$PWD'))
     interpolation = str(arguments.get('--interpolation', interpol.default)).lower()
+    downscaling = str(arguments.get('--downscaling') or downscaler.default).lower()
+    benchmark_downscaling_flag = bool(arguments.get('--benchmark-downscaling'))
+    largest = str(arguments.get('--largest') or "0")
+    backend = str(arguments.get('--backend') or resize.default).lower()
+    benchmark_backends_flag = bool(arguments.get('--benchmark-backends'))
+    targets = str(arguments.get('--targets') or "1x,2x,3x").lower()
+    formats = str(arguments.get('--formats') or save.format).lower()
     siz = str(arguments.get('--size', "3x")).lower()
     catalog_flag = bool(arguments.get('--catalog-directory'))
     catalog_name = unicode(arguments.get('--catalog', u"«Assets»")) # unicode == str on PY3
     makefolders = bool(arguments.get('--create-subfolders'))
     writejson = bool(arguments.get('--write-contents-json'))
     shortcut = bool(arguments.get('--asset-catalog'))
+    jobs = str(arguments.get('--jobs') or "1")
+    incremental = bool(arguments.get('--incremental'))
+    profile = str(arguments.get('--profile') or save.default).lower()
+    recompressing = bool(arguments.get('--recompress'))
+    watching = bool(arguments.get('--watch'))
     verbose = bool(arguments.get('--verbose'))
     
     # Process arguments:
     
     if opth == "$PWD":
         opth = os.environ.get('PWD', os.getcwd())
-        warnings.warn("Writing images to working directory: %s" % opth,
-                      OptionsWarning,
-                      source=None, stacklevel=0)
+        if not (benchmark_downscaling_flag or benchmark_backends_flag):
+            warnings.warn("Writing images to working directory: %s" % opth,
+                          OptionsWarning,
+                          source=None, stacklevel=0)
     else:
         opth = os.path.expanduser(opth)
     
     if not siz.endswith('x'):
         siz = "%sx" % siz
     
+    targets = [target.strip() for target in targets.split(",") if target.strip()]
+    targets = [target.isdigit() and "%sx" % target or target for target in targets]
+    formats = [format.strip() for format in formats.split(",") if format.strip()]
+    
     if shortcut:
         catalog_name = CATALOG_NAME_DEFAULT
         makefolders = True
         writejson = True
     
+    if watching:
+        incremental = True
+    
     if catalog_name == u"«Assets»":
         catalog_name = catalog_flag and CATALOG_NAME_DEFAULT or ""
     
@@ -558,60 +2038,87 @@ def cli(argv=None, debug=False):
     if not siz in sizes:
         raise ArgumentError("Unrecognized size: %s" % siz)
     
-    if catalog:
-        opth = catalog_folder_path(opth, catalog_name)
+    if not downscaling in downscaler.methods:
+        raise ArgumentError("Unknown downscaling method: %s" % downscaling)
     
-    if writejson:
-        # Raise an error if a JSON file exists, before wasting time doing work
-        # on all the rest of everything else:
-        json_path = json_file_path(opth)
-        if os.path.exists(json_path):
-            raise FilesystemError("JSON metadata file exists: %s" % json_path)
+    try:
+        largest = int(largest, base=10)
+    except ValueError:
+        raise ArgumentError("Bad maximum pixel size: %s" % largest)
     
-    # Begin verbose output:
+    if largest < 0:
+        raise ArgumentError("Bad maximum pixel size: %s" % largest)
     
-    if verbose:
-        print()
+    if not profile in save.profiles:
+        raise ArgumentError("Unknown encode profile: %s" % profile)
     
-    if shortcut and verbose:
-        print("» Enabling all asset catalog write options:")
-        print("» JSON, root catalog folder, imageset subfolders")
+    if recompressing and profile == "archival":
+        warnings.warn("Images encoded with the “archival” profile won’t be recompressed",
+                      OptionsWarning,
+                      source=None, stacklevel=0)
+        recompressing = False
     
-    # Create our internal-use data-storage structures:
+    if not backend in resize.backends:
+        raise ArgumentError("Unknown resampling backend: %s" % backend)
     
-    inputs = OrderedDict()
-    outputs = OrderedDict()
-    relative_to = catalog and os.path.dirname(opth) or opth
-    filenames = []
-    closed = 0
+    if not targets:
+        raise ArgumentError("No target sizes provided")
     
-    # Open image handles for each input image file:
+    for target in targets:
+        if not (target in sizes or target in densities):
+            raise ArgumentError("Unrecognized target size: %s" % target)
     
-    for source_path in ipths:
-        inputs[source_path] = Image.open(source_path)
+    if not formats:
+        raise ArgumentError("No output formats provided")
     
-    # Generate output images from input image files:
+    for format in formats:
+        if not format in save.formats:
+            raise ArgumentError("Unknown output format: %s" % format)
+        if not encodable(format):
+            raise ArgumentError("Output format unsupported by this PIL/Pillow: %s" % format)
     
-    if verbose:
-        howmany = len(inputs)
-        qualquan = howmany != 1 and "s" or ""
-        print("» Generating %s imageset%s from %s source image%s…" % (
-              howmany,
-              qualquan, siz,
-              qualquan))
-    
-    for source_path, image in inputs.items():
-        outputs[source_path] = generate(image, siz,
-                                        interpolation=interpolation,
-                                        verbose=verbose)
+    targets = sorted(set(targets))
+    formats = sorted(set(formats), key=formats.index)
+    
+    # If we’re benchmarking the downscaling methods or resampling backends,
+    # do only that -- nothing gets written anywhere -- and exit immediately
+    # thereafter:
+    
+    if benchmark_downscaling_flag:
+        show_downscaling_benchmark(expand_sources(ipths), siz, interpolation)
+        raise DisplayAndExit()
+    
+    if benchmark_backends_flag:
+        show_backend_benchmark(expand_sources(ipths), siz, interpolation)
+        raise DisplayAndExit()
+    
+    try:
+        jobs = int(jobs, base=10)
+    except ValueError:
+        raise ArgumentError("Bad number of jobs: %s" % jobs)
+    
+    if jobs < 0:
+        raise ArgumentError("Bad number of jobs: %s" % jobs)
+    elif jobs == 0:
+        jobs = multiprocessing.cpu_count()
+    
+    if catalog:
+        opth = catalog_folder_path(opth, catalog_name)
+    
+    # Directories given as sources stand in for the images within them --
+    # in watch mode, they get expanded anew for each build:
+    
+    if not watching:
+        ipths = expand_sources(ipths)
+    
+    # Begin verbose output:
     
     if verbose:
-        print("» Generated image sizes:")
-        for source_path, output_images in outputs.items():
-            for size, image in sorted(output_images.items()):
-                width, height = image.size
-                print("» %s %s: %s x %s" % (source_path, size, width, height))
-        print("» Image generation complete.")
+        print()
+    
+    if shortcut and verbose:
+        print("» Enabling all asset catalog write options:")
+        print("» JSON, root catalog folder, imageset subfolders")
     
     # Create the asset catalog root folder, if it’s called for:
     
@@ -621,68 +2128,60 @@ def cli(argv=None, debug=False):
             print("» Created asset catalog root folder %s" % opth)
     
     if verbose:
-        print("» Writing %s output images to %s…" % (len(inputs) * len(sizes), opth))
-    
-    # This is the primary output loop, iterating over the generated images:
-    
-    for source_path, output_images in outputs.items():
-        output_base_path = opth
-        imageset_filenames = []
-        
-        if makefolders:
-            imageset_dir = imageset_folder_name(source_path)
-            output_base_path = os.path.join(opth, imageset_dir)
-            if not os.path.isdir(output_base_path):
-                os.makedirs(output_base_path)
-                if verbose:
-                    print("» Created imageset subfolder %s" % imageset_dir)
-        
-        for size, image in sorted(output_images.items()):
-            image_filename = save(image, output_path_with_size(source_path,
-                                                               output_base_path,
-                                                               size), verbose=verbose)
-            if writejson:
-                imageset_filenames.append({
-                              'scale'  :  size,
-                           'filename'  :  image_filename })
-        if writejson:
-            if makefolders:
-                # Write a Contents.json file referencing the image files present
-                # in the current list of filenames, to the current subfolder:
-                write_to_path(namelist_to_json(imageset_filenames,
-                                               verbose=verbose),
-                              json_file_path(output_base_path),
-                              relative_to=relative_to,
-                              verbose=verbose)
-            else:
-                # Tack the current list of filenames onto the master list:
-                filenames.extend(imageset_filenames)
+        print("» Generating imagesets from %s source images, writing to %s…" % (siz, opth))
     
-    # Write a Contents.json file, with either:
-    #   1) only the stub JSON (if subfolders were created), or
-    #   2) references to *all* of the generated image files (if we
-    #      eschewed subfolders and wrote everything to one directory).
-    
-    if writejson:
-        base_json = makefolders and stub_json() or namelist_to_json(filenames,
-                                                                    verbose=verbose)
-        write_to_path(base_json,
-                      json_file_path(opth),
-                      relative_to=relative_to,
-                      verbose=verbose)
+    # With more than one job, there’s a pool of worker processes -- which,
+    # in watch mode, stays warm from one build to the next:
     
-    if verbose:
-        print("» File I/O complete.")
+    pool = None
+    if jobs > 1:
+        if verbose:
+            print("» Using a pool of %i worker processes" % jobs)
+        pool = multiprocessing.Pool(processes=jobs)
     
-    # Close all open PIL/Pillow image handles:
+    def build_all():
+        """ Build every source image, as called for, in this process """
+        # In watch mode, sources may have come or gone since the last build:
+        source_paths = ipths
+        if watching:
+            source_paths = [source_path for source_path in expand_sources(ipths) \
+                                         if os.path.isfile(source_path)]
+        return build(source_paths, opth, siz,
+                     targets=targets,
+                     formats=formats,
+                     interpolation=interpolation,
+                     downscaling=downscaling,
+                     profile=profile,
+                     largest=largest,
+                     backend=backend,
+                     makefolders=makefolders,
+                     writejson=writejson,
+                     incremental=incremental,
+                     recompressing=recompressing,
+                     relative_to=catalog and os.path.dirname(opth) or opth,
+                     pool=pool,
+                     verbose=verbose)
     
-    for output_images in outputs.values():
-        for image in output_images.values():
-            image.close()
-            closed += 1
+    def build_changed():
+        """ Build whatever source images changed, reporting -- rather than
+            raising -- any errors, so as to keep on watching regardless
+        """
+        try:
+            build_all()
+        except (IOError, OSError) as exc:
+            print("[error] build failed: %s" % exc, file=sys.stderr)
     
-    if verbose:
-        print("» Closed %i image handles." % closed)
+    try:
+        if watching:
+            watch(ipths, build_changed, verbose=verbose)
+        else:
+            build_all()
+            recompress_finish()
+    finally:
+        recompress_finish(cancel=True)
+        if pool is not None:
+            pool.terminate()
+            pool.join()
     
     # End verbose output:
     
@@ -690,6 +2189,85 @@ def cli(argv=None, debug=False):
         print("» Thank you for choosing asscat.py!")
         print()
 
+def test_numpy_backend():
+    """ » Checking the “numpy” resampling backend against “pillow” … """
+    print(test_numpy_backend.__doc__)
+    print()
+    
+    if numpy is None:
+        print("»»» NumPy isn’t installed -- skipping")
+        print()
+        return
+    
+    # Random pixels, some of them translucent, make for the worst case --
+    # every output pixel must come out within ±2 of Pillow’s own:
+    random = numpy.random.RandomState(0)
+    for mode, shape in (('L',    (300, 300)),
+                        ('LA',   (300, 300, 2)),
+                        ('RGB',  (300, 300, 3)),
+                        ('RGBA', (300, 300, 4))):
+        image = Image.fromarray(random.randint(0, 256, shape).astype(numpy.uint8), mode=mode)
+        for interpolation in sorted(interpol.methods):
+            for dimensions in ((100, 100), (123, 77), (450, 300)):
+                ours = numpy.asarray(numpy_resize(image, dimensions, interpolation), dtype=int)
+                theirs = numpy.asarray(pillow_resize(image, dimensions, interpolation), dtype=int)
+                worst = numpy.abs(ours - theirs).max()
+                assert worst <= 2, "%s “%s” %s: off by %i" % (mode, interpolation,
+                                                               dimensions, worst)
+        print("»»» %s: OK" % mode)
+    print()
+
+def test_command_line():
+    """ » Checking the asscat.py command line, end to end … """
+    print(test_command_line.__doc__)
+    print()
+    
+    import shutil, subprocess, tempfile
+    
+    def run(*arguments):
+        with open(os.devnull, 'wb') as devnull:
+            return subprocess.call((sys.executable, os.path.abspath(__file__)) + arguments,
+                                   stdout=devnull,
+                                   stderr=devnull)
+    
+    # The informational options all exit cleanly:
+    for option in ('--show-valid-sizes',
+                   '--show-interpolation-methods',
+                   '--show-save-options',
+                   '--show-sanitized-help'):
+        assert run(option) == 0, option
+    
+    # … as does a real build, which makes an asset catalog of the source:
+    tempdir = tempfile.mkdtemp(prefix='asscat-')
+    try:
+        source_path = os.path.join(tempdir, 'smoke.png')
+        output_dir = os.path.join(tempdir, 'out')
+        os.makedirs(output_dir)
+        Image.new('RGBA', (90, 90), (255, 0, 128, 192)).save(source_path)
+        assert run(source_path, '-d', output_dir, '-C') == 0
+        imageset = os.path.join(catalog_folder_path(output_dir), 'smoke.imageset')
+        for size, side in (('1x', 30), ('2x', 60), ('3x', 90)):
+            image = Image.open(os.path.join(imageset, 'smoke@%s.png' % size))
+            assert image.size == (side, side), image.size
+            image.close()
+        assert os.path.isfile(json_file_path(imageset))
+        
+        # … and a bad argument doesn’t:
+        assert run(source_path, '-d', output_dir, '--size=7x') != 0
+    finally:
+        shutil.rmtree(tempdir)
+    
+    print("»»» OK")
+    print()
+
+def test():
+    """ Inline tests for asscat.py -- run them with:
+            
+            $ python -c "import asscat; asscat.test()"
+    """
+    test_numpy_backend()
+    test_command_line()
+
 def main(debug=False):
     """ Execute the primary command-line entry point function,
         trapping any exceptions of classes we expect might get raised:
@@ -704,11 +2282,11 @@ def main(debug=False):
     
     # Execute main entry point, catching exceptions:
     try:
-        # cli(sys.argv, debug=debug)
+        cli(sys.argv, debug=debug)
         # cli(['asscat.py', '--show-valid-sizes'], debug=debug)
         # cli(['asscat.py', '--show-interpolation-methods'], debug=debug)
         # cli(['asscat.py', '--show-save-options'], debug=debug)
-        cli(['asscat.py', '--show-sanitized-help'], debug=debug)
+        # cli(['asscat.py', '--show-sanitized-help'], debug=debug)
     except ArgumentError:
         error("bad arguments passed:")
         raise
@@ -9,7 +9,7 @@ import appdirectories as appdirs
 from replutilities import attr, isstring, isbytes
 from replutilities import Exporter, NoDefault
 
-exporter = Exporter()
+exporter = Exporter(lazy=True)
 export = exporter.decorator()
 
 # UTILITY STUFF: Exceptions
@@ -1,6 +1,9 @@
 # -*- encoding: utf-8 -*-
 from __future__ import print_function
+import replprofile
 from replutilities import test, thingname_search_by_id
 from replutilities import *
 from replenv import *
-import keyvalue
\ No newline at end of file
+import keyvalue
+replprofile.finish()
+del replprofile
@@ -1,5 +1,8 @@
 # -*- encoding: utf-8 -*-
+import replprofile
 from replenv import *
 if six.PY3:
     from replutilities import *
     import keyvalue
+replprofile.finish()
+del replprofile
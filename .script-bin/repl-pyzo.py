@@ -13,6 +13,9 @@ Y88b.    Y88b 888 Y88b.  888  888 Y88..88P 888  888 Y88b  d88P d8b Y88b  d88P
           "Y88P"                                                              
 """
 from __future__ import print_function
+import replprofile
 from replenv import *
 from replutilities import *
-import keyvalue
\ No newline at end of file
+import keyvalue
+replprofile.finish()
+del replprofile
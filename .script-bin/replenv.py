@@ -158,7 +158,6 @@ banners['pypy2.7'] = """
 """
 
 # Add miscellaneous necessities:
-from PIL import Image
 from pprint import pprint, pformat
 import sys, os, re
 import appdirectories
@@ -168,18 +167,146 @@ import colorama
 import contextlib
 import copy
 import datetime
-import decimal
 import functools
-import inspect
+import importlib
 import itertools
 import math
-import requests
 import shutil
 import six
-import sysconfig
-import termcolor
 import types
-import xerox
+
+# Lazy imports -- the REPL namespace is mostly there for the odd
+# interactive rummage, so there’s no sense in paying for `numpy` et al.
+# on every single startup; these get imported upon first attribute access:
+
+def find_module(name):
+    """ Return True if the named module can be imported, without importing it
+        (parent packages of dotted names do get imported, though)
+    """
+    if name in sys.modules:
+        return True
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        # Python 2 has no lazy anything -- just import the thing:
+        try:
+            importlib.import_module(name)
+        except (ImportError, SyntaxError):
+            return False
+        return True
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def lazy_import(name):
+    """ Return a module whose body won’t run until one of its attributes
+        is first accessed -- at which point it turns into the real module,
+        in place, via `importlib.util.LazyLoader`. The module is installed
+        in `sys.modules` so later `import` statements get the same thing.
+        
+        Falls back to a plain old import on Python 2, or for any module
+        whose loader can’t be made lazy (e.g. extension modules).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        from importlib.util import find_spec, module_from_spec, LazyLoader
+    except ImportError:
+        return importlib.import_module(name)
+    spec = find_spec(name)
+    if spec is None:
+        raise ImportError("No module named %s" % name, name=name)
+    if not hasattr(spec.loader, 'exec_module') or \
+           hasattr(spec.loader, 'create_module') and \
+           spec.loader.create_module(spec) is not None:
+        return importlib.import_module(name)
+    spec.loader = LazyLoader(spec.loader)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    # Bind it to its parent package, as `import` itself would:
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+class LazyValue(object):
+    
+    """ A stand-in for a non-module value that’s costly to compute, e.g.
+        an opened image. The factory gets called on first use; thereafter
+        the proxy rebinds any names pointing at it -- in this module and
+        in `__main__` -- to the real value, and forwards everything else.
+    """
+    __slots__ = ('name', 'factory', 'value')
+    
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.value = None
+    
+    def resolve(self):
+        if self.factory is not None:
+            self.value = self.factory()
+            self.factory = None
+            main = sys.modules.get('__main__')
+            for namespace in (globals(), getattr(main, '__dict__', {})):
+                for key, value in tuple(namespace.items()):
+                    if value is self:
+                        namespace[key] = self.value
+        return self.value
+    
+    def __getattr__(self, key):
+        return getattr(self.resolve(), key)
+    
+    def __repr__(self):
+        if self.factory is not None:
+            return "<lazy %s (unresolved)>" % self.name
+        return repr(self.value)
+    
+    def __iter__(self):
+        return iter(self.resolve())
+    
+    def __len__(self):
+        return len(self.resolve())
+    
+    def __getitem__(self, key):
+        return self.resolve()[key]
+    
+    def __bool__(self):
+        return bool(self.resolve())
+    
+    __nonzero__ = __bool__
+
+# Tables computed on startup are cached in a snapshot, q.v. `replsnapshot`:
+try:
+    from replsnapshot import snapshot
+except (ImportError, SyntaxError):
+    snapshot = None
+
+# Seed the `replutilities` clade dispatch table from the snapshot, and save
+# it at exit -- this happens here, and not in `replutilities` itself, so that
+# only REPL sessions go anywhere near the snapshot file:
+if snapshot is not None:
+    try:
+        import replutilities
+    except (ImportError, SyntaxError):
+        pass
+    else:
+        replutilities.clade_dispatch.update(
+            snapshot.get('clade_dispatch', builder=dict,
+                                           sources=(replutilities.__file__,),
+                                           decode=replutilities.decode_clade_dispatch))
+        snapshot.persist('clade_dispatch', replutilities.encode_clade_dispatch,
+                                           sources=(replutilities.__file__,))
+
+Image = lazy_import('PIL.Image')
+decimal = lazy_import('decimal')
+inspect = lazy_import('inspect')
+requests = lazy_import('requests')
+sysconfig = lazy_import('sysconfig')
+termcolor = lazy_import('termcolor')
+xerox = lazy_import('xerox')
 
 # Determine if we’re on PyPy and/or Python 3:
 PY3 = sys.version_info.major > 2
@@ -253,41 +380,33 @@ else:
     if PY3:
         __all__ += (u'Σ',)
 
-try:
-    import numpy
-    import scipy
-except (ImportError, SyntaxError):
-    pass
-else:
+if find_module('numpy') and find_module('scipy'):
+    numpy = lazy_import('numpy')
+    scipy = lazy_import('scipy')
     # Extend `__all__`:
     __all__ += ('numpy', 'scipy')
 
-try:
-    import colorio
-    import colormath
-except (ImportError, SyntaxError):
-    pass
-else:
+if find_module('colorio') and find_module('colormath'):
+    colorio = lazy_import('colorio')
+    colormath = lazy_import('colormath')
     # Extend `__all__`:
     __all__ += ('colorio', 'colormath')
 
-try:
-    import dateutil
-except (ImportError, SyntaxError):
-    pass
-else:
+if find_module('dateutil'):
+    dateutil = lazy_import('dateutil')
     # Extend `__all__`:
     __all__ += ('dateutil',)
 
 try:
     import abc
     import collections.abc as collectionsabc
-    import asciiplotlib
 except (ImportError, SyntaxError):
     pass
 else:
-    # Extend `__all__`:
-    __all__ += ('abc', 'collectionsabc', 'asciiplotlib')
+    if find_module('asciiplotlib'):
+        asciiplotlib = lazy_import('asciiplotlib')
+        # Extend `__all__`:
+        __all__ += ('abc', 'collectionsabc', 'asciiplotlib')
 
 try:
     from halogen.filesystem import (which, TemporaryName, Directory,
@@ -301,19 +420,27 @@ else:
                     'TemporaryDirectory',
                     'TemporaryNamedFile')
 
-try:
-    from instakit.utils.static import asset
-except (ImportError, SyntaxError):
-    pass
-else:
+if find_module('instakit.utils.static'):
     # Extend `__all__`:
     __all__ += ('asset', 'image_paths', 'catimage')
+    def get_asset():
+        from instakit.utils.static import asset
+        return asset
+    asset = LazyValue('asset', get_asset)
     # Prepare a list of readily open-able image file paths:
-    image_paths = list(map(
-        lambda image_file: asset.path('img', image_file),
-            asset.listfiles('img')))
+    def get_image_paths():
+        return list(map(
+            lambda image_file: asset.path('img', image_file),
+                asset.listfiles('img')))
+    def get_snapshot_image_paths():
+        # snapshotted, keyed by the image directory’s mtime:
+        if snapshot is None:
+            return get_image_paths()
+        return snapshot.get('image_paths', builder=get_image_paths,
+                                           sources=(asset.path('img'),))
+    image_paths = LazyValue('image_paths', get_snapshot_image_paths)
     # I do this practically every time, so I might as well do it here:
-    catimage = Image.open(image_paths[0])
+    catimage = LazyValue('catimage', lambda: Image.open(image_paths[0]))
 
 # `__dir__` listifies `__all__`:
 __dir__ = lambda: list(__all__)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+replprofile.py
+
+• Import-time instrumentation for the REPL bootstrap – a structured take on
+  `python -X importtime`, which records the wall time spent on each import
+  made while `replenv`, `replutilities`, `keyvalue` et al. are being set up.
+• Enabled by setting REPLENV_IMPORTTIME=1 in the environment; import this
+  module before anything else in a REPL entry script, and call `finish()`
+  at the end of that script:
+    
+    import replprofile
+    from replenv import *
+    …
+    replprofile.finish()
+    del replprofile     # … so as not to leave it in the REPL namespace
+
+• On `finish()` (or at exit, if `finish()` never got called) a report sorted
+  by cumulative time, and a JSON trace of every import, get written into
+  the `replenv` user cache directory, as per `appdirectories`.
+
+"""
+from __future__ import print_function
+
+import atexit
+import datetime
+import json
+import sys, os
+import threading
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+try:
+    from time import perf_counter as timer
+except ImportError:
+    from time import time as timer
+
+# Are we instrumenting imports?
+ENABLED = bool(int(os.environ.get('REPLENV_IMPORTTIME', '0'), base=10))
+
+# Filename prefix for reports and traces:
+PREFIX = 'importtime'
+
+class ImportRecord(object):
+    
+    """ The timing for one import: the module name, the time spent in
+        the module’s own import (“self”) and the time spent in that plus
+        all of its nested imports (“cumulative”), both in microseconds,
+        along with its nesting depth, the name of the importing module,
+        and whether or not the import failed (by raising an exception).
+    """
+    __slots__ = ('name', 'self_us', 'cumulative_us', 'depth', 'parent', 'order',
+                 'failed')
+    
+    def __init__(self, name, self_us, cumulative_us, depth, parent, order,
+                                                                    failed=False):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+        self.parent = parent
+        self.order = order
+        self.failed = failed
+    
+    def to_dict(self):
+        return dict((slot, getattr(self, slot)) for slot in type(self).__slots__)
+    
+    def __repr__(self):
+        return "%s(%s, self=%ius, cumulative=%ius%s)" % (type(self).__name__,
+                                                         self.name,
+                                                         self.self_us,
+                                                         self.cumulative_us,
+                                                         self.failed and ", failed" or "")
+
+class ImportProfiler(object):
+    
+    """ Times imports by standing in for `builtins.__import__(…)`.
+        
+        Only imports that actually load something are recorded -- that is,
+        those for modules that aren’t already in `sys.modules`. N.B. imports
+        made through `importlib.import_module(…)` bypass `__import__(…)`,
+        and so their time gets folded into the “self” time of the importer.
+        
+        Each thread nests its imports on its own stack, so imports running
+        concurrently in other threads don’t get tangled up with each other.
+    """
+    
+    def __init__(self):
+        self.records = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.original = None
+        self.started = None
+        self.finished = None
+    
+    @property
+    def stack(self):
+        """ The calling thread’s stack of imports in progress """
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+    
+    @property
+    def installed(self):
+        return self.original is not None
+    
+    def install(self):
+        """ Start timing imports """
+        if not self.installed:
+            self.original = builtins.__import__
+            builtins.__import__ = self.timed_import
+            self.started = timer()
+        return self
+    
+    def uninstall(self):
+        """ Stop timing imports """
+        if self.installed:
+            builtins.__import__ = self.original
+            self.original = None
+            self.finished = timer()
+        return self
+    
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """ The `__import__(…)` stand-in: times the import, if it’s new """
+        fullname = name
+        if level > 0 and globals:
+            package = globals.get('__package__') or globals.get('__name__', '')
+            base = package.rsplit('.', level - 1)[0] if level > 1 else package
+            fullname = base and name and "%s.%s" % (base, name) or base or name
+        if fullname in sys.modules:
+            return self.original(name, globals, locals, fromlist, level)
+        
+        stack = self.stack
+        frame = [fullname, 0.0] # name, time spent in nested imports
+        stack.append(frame)
+        failed = True
+        start = timer()
+        try:
+            module = self.original(name, globals, locals, fromlist, level)
+            failed = False
+            return module
+        finally:
+            elapsed = timer() - start
+            stack.pop()
+            parent = stack and stack[-1][0] or None
+            if stack:
+                stack[-1][1] += elapsed
+            with self.lock:
+                self.records.append(ImportRecord(fullname,
+                                                 int((elapsed - frame[1]) * 1e6),
+                                                 int(elapsed * 1e6),
+                                                 len(stack),
+                                                 parent,
+                                                 len(self.records),
+                                                 failed=failed))
+    
+    def total_us(self):
+        """ Total time spent on top-level imports, in microseconds """
+        return sum(record.cumulative_us for record in self.records \
+                                         if record.depth == 0)
+    
+    def sorted_records(self, key='cumulative_us'):
+        return sorted(self.records, key=lambda record: getattr(record, key),
+                                    reverse=True)
+    
+    def report(self, limit=None):
+        """ Return a plain-text report, sorted by cumulative import time """
+        lines = ["≠≠≠ IMPORT TIMES: %i imports, %i µs total (Python %s)" % (
+                 len(self.records), self.total_us(),
+                 sys.version.split()[0]),
+                 "",
+                 "%12s │ %12s │ %s" % ("cumulative", "self", "module")]
+        for record in self.sorted_records()[:limit]:
+            lines.append("%12i │ %12i │ %s%s" % (record.cumulative_us,
+                                                record.self_us,
+                                                record.name,
+                                                record.failed and " (failed)" or ""))
+        return "\n".join(lines) + "\n"
+    
+    def trace(self):
+        """ Return a JSON-encodable dictionary of everything recorded """
+        return { 'python'       : sys.version.split()[0],
+                 'executable'   : sys.executable,
+                 'argv'         : list(sys.argv),
+                 'timestamp'    : datetime.datetime.now().isoformat(),
+                 'total_us'     : self.total_us(),
+                 'imports'      : [record.to_dict() for record in self.records] }
+    
+    def write(self, directory=None):
+        """ Write out the report and the JSON trace, returning their paths """
+        if directory is None:
+            from replsnapshot import cache_directory
+            directory = cache_directory()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        report_path = os.path.join(directory, "%s-%s.txt" % (PREFIX, stamp))
+        trace_path = os.path.join(directory, "%s-%s.json" % (PREFIX, stamp))
+        with open(report_path, 'wb') as handle:
+            handle.write(self.report().encode('utf-8'))
+        with open(trace_path, 'w') as handle:
+            json.dump(self.trace(), handle, indent=4)
+        return report_path, trace_path
+
+profiler = ImportProfiler()
+
+def finish(verbose=True):
+    """ Stop profiling, and write out the report and trace -- this is
+        a no-op unless REPLENV_IMPORTTIME was set in the environment
+    """
+    if not profiler.installed:
+        return None
+    profiler.uninstall()
+    paths = profiler.write()
+    if verbose:
+        print("» Import times: %i imports, %0.1f ms; report written to %s" % (
+              len(profiler.records),
+              profiler.total_us() / 1000.0,
+              paths[0]), file=sys.stderr)
+    return paths
+
+if ENABLED:
+    profiler.install()
+    atexit.register(finish)
+
+__all__ = ('ImportRecord', 'ImportProfiler',
+           'profiler', 'finish', 'ENABLED')
+__dir__ = lambda: list(__all__)
@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+replsanitize.py
+
+• Sanitization rule sets -- named, ordered sequences of (regex source,
+  substitution) pairs that swap high-codepoint glyphs for ASCII-friendly
+  versions -- and the engine that compiles them down to as few passes
+  over the text as it can manage:
+    
+    from replsanitize import rulesets
+    print(rulesets['xcode-help'](u"“yo” – √dogg"))
+
+• `sanitize_stream(…)` sanitizes streams of text of any size, in bounded
+  memory -- q.v. `sanitize-text.py` for the command-line version.
+• This module stands alone: scripts like `asscat.py` use it without
+  pulling in the rest of the REPL environment; `replutilities` re-exports
+  all of it, along with its own deferred `sanitize(…)` function.
+
+"""
+from __future__ import print_function
+
+from collections import OrderedDict
+from itertools import chain
+import codecs
+import functools
+import re
+import sys, time
+
+ENCODING = sys.getfilesystemencoding().upper() # 'UTF-8'
+PY3 = sys.version_info.major > 2
+
+if PY3:
+    unicode = str
+    unichr = chr
+
+try:
+    from functools import lru_cache
+except ImportError:
+    def lru_cache(**keywrds):
+        """ No-op dummy decorator for lesser Pythons """
+        def inside(function):
+            return function
+        return inside
+
+try:
+    from six import string_types
+except (ImportError, SyntaxError):
+    string_types = PY3 and (str,) or (str, unicode)
+
+isstring = lambda thing: isinstance(thing, string_types)
+
+# Matches regex source for a single literal character, or a bracketed
+# class of literal characters -- that is, patterns that can be replaced
+# with a `str.translate(…)` table:
+single_codepoints = re.compile(r"^(?:\[(?P<chars>[^\\\[\]\^\-]+)\]|(?P<char>[^\\.^$*+?{}\[\]|()]))$")
+
+def codepoints_for(sanitizer, substitution):
+    """ Return the characters matched by a sanitizer regex, if it can be
+        applied as a translation table -- or None, if it can’t
+    """
+    if not isstring(substitution) or '\\' in substitution:
+        return None
+    if sanitizer.groups or sanitizer.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+    match = single_codepoints.match(sanitizer.pattern)
+    if match is None:
+        return None
+    return match.group('chars') or match.group('char')
+
+def sanitize_sequentially(text, sanitizers):
+    """ Apply each of the sanitizers to the text, one after another, in
+        a full pass per sanitizer -- the reference implementation for
+        `compile_sanitizers(…)`, q.v. sub.
+    """
+    sanitized = unicode(text)
+    for sanitizer, substitution in sanitizers:
+        sanitized, _ = sanitizer.subn(substitution, sanitized)
+    return sanitized
+
+def compile_sanitizers(sanitizers):
+    """ Compile a sequence of (regex, substitution) pairs -- as per the
+        `sanitize.sanitizers` table -- into a function that makes the same
+        replacements as `sanitize_sequentially(…)` but in far fewer passes.
+        
+        Runs of consecutive single-codepoint rules are folded into one
+        replacement table apiece, with later rules in a run applied to the
+        outputs of earlier ones; each table is then applied in one pass.
+        Only the more involved rules (like the `√` rule and its argument)
+        are left to run as they are, in between the tables. The stock
+        `sanitize.sanitizers` table thus compiles down to three passes:
+        a table, the `√` rule, and another table.
+        
+        Tables are applied with a character-class regex when matches are
+        sparse, as the regex engine skips through unmatched spans at C speed,
+        and with `str.translate(…)` when they’re dense, or when the text is
+        all ASCII -- the latter looks up every last character in its table
+        (though it caches lookups for ASCII) but without calling back into
+        Python for each match. The density is sampled from the first
+        `compile_sanitizers.sample` characters of the text.
+    """
+    stages = []
+    table = {}
+    
+    for sanitizer, substitution in sanitizers:
+        characters = codepoints_for(sanitizer, substitution)
+        if characters is None:
+            stages.append(table)
+            stages.append((sanitizer, substitution))
+            table = {}
+            continue
+        # Apply the new rule to any existing outputs, then add it:
+        for codepoint, output in table.items():
+            for character in characters:
+                output = output.replace(character, substitution)
+            table[codepoint] = output
+        for character in characters:
+            table.setdefault(ord(character), substitution)
+    stages.append(table)
+    
+    compiled = []
+    for stage in stages:
+        if type(stage) is tuple:
+            compiled.append(lambda text, stage=stage: stage[0].sub(stage[1], text))
+        elif stage:
+            compiled.append(compile_table(stage))
+    compiled = tuple(compiled)
+    
+    def sanitize_compiled(text):
+        """ Sanitize text with the compiled stages """
+        sanitized = unicode(text)
+        for stage in compiled:
+            sanitized = stage(sanitized)
+        return sanitized
+    
+    sanitize_compiled.stages = compiled
+    return sanitize_compiled
+
+# `str.isascii()` is a constant-time check, where it exists:
+isascii = getattr(unicode, 'isascii', None) or (lambda text: all(ord(character) < 128 \
+                                                                 for character in text))
+
+# Characters sampled to decide between a regex or `str.translate(…)`,
+# and the match density above which the latter gets used:
+compile_sanitizers.sample = 4096
+compile_sanitizers.density = 0.05
+
+def compile_table(table):
+    """ Return a function applying a translation table, q.v. supra. """
+    lookup = dict((unichr(codepoint), output) for codepoint, output in table.items())
+    table_re = re.compile("[%s]" % "".join(re.escape(character) for character in sorted(lookup)))
+    replace = lambda match: lookup[match.group(0)]
+    highonly = all(codepoint > 127 for codepoint in table)
+    
+    def apply_table(text):
+        if isascii(text):
+            # A table of high codepoints alone has nothing to do with ASCII
+            # text -- otherwise, `str.translate(…)` caches ASCII lookups:
+            return highonly and text or text.translate(table)
+        sample = compile_sanitizers.sample
+        if len(text) > sample:
+            matches = len(table_re.findall(text, 0, sample))
+            if matches > sample * compile_sanitizers.density:
+                return text.translate(table)
+        return table_re.sub(replace, text)
+    
+    return apply_table
+
+# Sanitization rule sets: named, ordered sequences of (regex source,
+# substitution) pairs, compiled upon first use -- q.v. `RuleSet` sub.
+
+class RuleSet(object):
+    
+    """ An immutable, ordered set of sanitization rules -- (pattern, substitution)
+        pairs, applied in order, à la `re.sub(…)` -- with a name and
+        an optional docstring. Rule sets compose with `+`, and can be
+        extended with further rules, both of which yield new rule sets;
+        their attributes are all read-only.
+        
+        Calling a rule set sanitizes text with it. Its compiled engine
+        (q.v. `compile_sanitizers(…)` supra.) is built on first use, and
+        is cached by the content of its rules -- so two rule sets with
+        the same rules share an engine, whatever they’re called.
+    """
+    __slots__ = ('__name__', '__rules__', '__flags__', '__docstring__')
+    
+    def __init__(self, name, rules, flags=re.MULTILINE, doc=None):
+        self.__name__ = name
+        self.__rules__ = tuple((pattern, substitution) for pattern, substitution in rules)
+        self.__flags__ = flags
+        self.__docstring__ = doc
+    
+    @property
+    def name(self):
+        """ The name of the rule set """
+        return self.__name__
+    
+    @property
+    def rules(self):
+        """ The rules, as a tuple of (regex source, substitution) pairs """
+        return self.__rules__
+    
+    @property
+    def flags(self):
+        """ The `re` flags with which the rules get compiled """
+        return self.__flags__
+    
+    @property
+    def doc(self):
+        """ The docstring for the rule set, if any """
+        return self.__docstring__
+    
+    @property
+    def key(self):
+        """ The content key for the compiled-engine cache """
+        return (self.flags, self.rules)
+    
+    @property
+    def sanitizers(self):
+        """ The rules as (compiled regex, substitution) pairs """
+        return compile_ruleset(self.key).sanitizers
+    
+    def compile(self):
+        """ Return the compiled engine for this rule set """
+        return compile_ruleset(self.key)
+    
+    def extend(self, name, rules, doc=None):
+        """ Return a new rule set with some rules tacked onto the end """
+        return type(self)(name, self.rules + tuple(rules), flags=self.flags,
+                                                          doc=doc or self.doc)
+    
+    def __add__(self, other):
+        return self.extend("%s+%s" % (self.name, other.name), other.rules)
+    
+    def __call__(self, text):
+        return compile_ruleset(self.key)(text)
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    def __iter__(self):
+        return iter(self.rules)
+    
+    def __repr__(self):
+        return "%s(%r, rules=%i)" % (type(self).__name__, self.name, len(self.rules))
+
+@lru_cache(maxsize=32)
+def compile_ruleset(key):
+    """ Compile the content of a rule set, as per `RuleSet.key` supra. --
+        N.B. `compile_ruleset.cache_info()` has the hit and miss counts
+    """
+    flags, rules = key
+    sanitizers = tuple((re.compile(pattern, flags), substitution) \
+                   for pattern, substitution in rules)
+    engine = compile_sanitizers(sanitizers)
+    engine.sanitizers = sanitizers
+    return engine
+
+class RuleSets(dict):
+    
+    """ The rule-set registry: a dictionary of rule sets, by name """
+    
+    def register(self, ruleset):
+        """ Register a rule set under its name, returning it """
+        if ruleset.name in self:
+            raise KeyError("rule set already registered: %s" % ruleset.name)
+        self[ruleset.name] = ruleset
+        return ruleset
+    
+    def define(self, name, rules, doc=None, flags=re.MULTILINE):
+        """ Create and register a new rule set """
+        return self.register(RuleSet(name, rules, flags=flags, doc=doc))
+    
+    def compose(self, name, *names, **kwargs):
+        """ Register a new rule set, made of the named rule sets in order,
+            plus any further rules passed as `rules=(…)`
+        """
+        rules = tuple(chain.from_iterable(self[each].rules for each in names))
+        rules += tuple(kwargs.pop('rules', ()))
+        return self.define(name, rules, **kwargs)
+
+rulesets = RuleSets()
+
+rulesets.define('xcode-help', doc="Typographical niceties, as found in help texts, "
+                                  "swapped for ASCII-friendly versions", rules=(
+    (r"[“”]",                            '"'),
+    (r"[‘’]",                            "'"),
+    (r"[«»]",                            ":"),
+    (r"[äáª]",                           "a"),
+    (r"[ëé]",                            "e"),
+    (r"[ïí]",                            "i"),
+    (r"[öóº]",                           "o"),
+    (r"[üú]",                            "u"),
+    (r"‽",                               "?!"),
+    (r"¡",                               "!"),
+    (r"¿",                               "?"),
+    (r"±",                               "+/-"),
+    (r"÷",                               "/"),
+    (r"•",                               "*"),
+    (r"ˆ",                               "^"),
+    (r"†",                               "<*>"),
+    (r"‡",                               "<**>"),
+    (r"§",                               "$"),
+    (r"¥",                               "Y"),
+    (r"¢",                               "c"),
+    (r"ƒ",                               "f"),
+    (r"∫",                               "S"),
+    (r"ß",                               "ss"),
+    (r"ﬂ",                               "fl"),
+    (r"ﬁ",                               "fi"),
+    (r"£",                               "lb."),
+    (r"",                               "Apple"),
+    (r"⌘",                               "command"),
+    (r"∞",                               "infinity"),
+    (r'√(?P<arg>[\w\d]*)',               'sqrt(\g<arg>)'),
+    (r"¶",                               "[P]"),
+    (r"[∂∆]",                            "d"),
+    (r"Ø",                               "0"),
+    (r"→",                               "->"),
+    (r"¬",                               "-]"),
+    (r"…",                               "..."),
+    (r"©",                               "(c)"),
+    (r"®",                               "(r)"),
+    (r"™",                               "(tm)"),
+    (r"—",                               "-")))
+
+rulesets.compose('ascii-strict', 'xcode-help',
+                 doc="Everything in “xcode-help”, with any remaining non-ASCII "
+                     "characters replaced by question marks",
+                 rules=((r"[^\x00-\x7f]",                  "?"),))
+
+def benchmark_rulesets(text=None, names=None, duration=0.5):
+    """ Measure the throughput of each of the named rule sets -- or all
+        of those registered -- returning a dict of chars/sec by name.
+        The default text is mostly-ASCII, with the odd high codepoint.
+    """
+    if text is None:
+        text = (u"Usage: yo “dogg” – i heard you like √x and ∞ → ‽ ¶\n" + \
+                u"lorem ipsum dolor sit amet, and so on and so forth\n" * 20) * 500
+    out = OrderedDict()
+    for name in names or sorted(rulesets):
+        ruleset = rulesets[name]
+        ruleset.compile()
+        count = 0
+        started = time.time()
+        while time.time() - started < duration:
+            ruleset(text)
+            count += len(text)
+        out[name] = int(count / (time.time() - started))
+    return out
+
+# ASCII non-word characters, before which a long line can be split --
+# none of them are touched by the stock sanitizers, and they all end
+# the argument to the `√` rule:
+nonword_re = re.compile(r"[\x00-\x2f\x3a-\x40\x5b-\x5e\x60\x7b-\x7f]")
+
+# … and the last of them in a string, found in a single backwards pass --
+# as the greedy `.*` backtracks from the end of the string:
+lastnonword_re = re.compile(r"(?s).*(%s)" % nonword_re.pattern)
+
+def sanitize_stream(source, sanitize=None, chunksize=65536, encoding=ENCODING):
+    """ Sanitize a stream of text, yielding sanitized chunks -- the source
+        can be a file-like object (anything with a `read(…)` method) or an
+        iterable of chunks, as either text or bytes (which get decoded
+        incrementally, using the given encoding). The sanitizer can be
+        any function, or the name of a registered rule set.
+        
+        Memory use is bounded, and time linear: text is only held back at
+        the end of each chunk until the next line break (or ASCII non-word
+        character, for lines longer than sixteen chunks) so that multi-
+        character matches, like the `√` rule and its argument, are never
+        split across chunks -- and only the newest chunk ever gets searched
+        for either. A line with neither of those in sixteen chunks’ worth
+        of text gets split wherever.
+        
+        N.B. that makes streaming only as good as a one-shot sanitize for
+        rules that never match across a line break or an ASCII non-word
+        character -- which all of the stock rule sets satisfy, but which
+        a custom rule set (or function) might not.
+    """
+    if sanitize is None:
+        sanitize = rulesets['xcode-help']
+    elif isstring(sanitize):
+        sanitize = rulesets[sanitize]
+    if hasattr(source, 'read'):
+        source = iter(functools.partial(source.read, chunksize), source.read(0))
+    decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+    hardlimit = chunksize * 16
+    held = []
+    length = split = 0
+    
+    for chunk in source:
+        if isinstance(chunk, bytes) and not isinstance(chunk, unicode):
+            chunk = decoder.decode(chunk)
+        
+        # Everything up to the chunk’s last line break can go:
+        index = chunk.rfind('\n') + 1
+        if index:
+            held.append(chunk[:index])
+            yield sanitize(''.join(held))
+            chunk = chunk[index:]
+            held, length, split = [], 0, 0
+        
+        # … the rest is held back, noting where it could be split:
+        match = lastnonword_re.match(chunk)
+        if match is not None and length + match.start(1):
+            split = length + match.start(1)
+        held.append(chunk)
+        length += len(chunk)
+        
+        # … unless there’s too much of it:
+        if length >= hardlimit:
+            text = ''.join(held)
+            index = split or length
+            yield sanitize(text[:index])
+            held, length, split = [text[index:]], length - index, 0
+    
+    held.append(decoder.decode(b'', final=True))
+    pending = ''.join(held)
+    if pending:
+        yield sanitize(pending)
+
+__all__ = ('sanitize_sequentially', 'compile_sanitizers',
+           'RuleSet', 'RuleSets', 'rulesets', 'compile_ruleset',
+           'benchmark_rulesets', 'sanitize_stream',
+           'ENCODING')
+__dir__ = lambda: list(__all__)
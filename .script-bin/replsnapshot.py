@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+"""
+replsnapshot.py
+
+• A warm-start snapshot for the REPL environment: tables that `replenv`
+  would otherwise recompute on every REPL launch get stashed, as JSON,
+  in the `replenv` user cache directory -- the same one that
+  `keyvalue.ReplEnvDirs.user_cache` points to -- and are read back in
+  on the next launch. Only REPL sessions (by way of `replenv`) read or
+  write the snapshot; merely importing this module does neither.
+• Each table is keyed by the mtimes of the source files it was computed
+  from; the whole snapshot is keyed by its format version and the Python
+  version. Touch a source file or switch Pythons, and the affected tables
+  get rebuilt from scratch:
+    
+    from replsnapshot import snapshot
+    names = snapshot.get('names', builder=lambda: sorted(dir(thing)),
+                                  sources=(__file__,))
+
+• Tables can also be persisted from live state when the snapshot gets
+  saved, at exit -- q.v. `Snapshot.persist(…)` sub.
+• Set REPLENV_SNAPSHOT=0 in the environment to neither read nor write
+  any snapshot whatsoever.
+
+"""
+from __future__ import print_function
+
+import atexit
+import json
+import sys, os
+
+# Bump this when the layout of the snapshot file changes:
+SNAPSHOT_VERSION = 1
+
+# Are we using the snapshot at all?
+ENABLED = bool(int(os.environ.get('REPLENV_SNAPSHOT', '1'), base=10))
+
+def cache_directory():
+    """ Get the `replenv` user cache directory – the same one that
+        the `keyvalue.ReplEnvDirs` class uses.
+    """
+    import appdirectories
+    dirs = appdirectories.AppDirs(appname='replenv', system='linux')
+    return dirs.user_cache_dir
+
+def python_version():
+    """ A string identifying the running Python, e.g. “cpython-3.11.4” """
+    implementation = getattr(sys, 'implementation', None)
+    name = implementation and implementation.name or 'python'
+    return "%s-%s" % (name, sys.version.split()[0])
+
+def mtimes_for(sources):
+    """ Map each source path to its mtime (None for missing paths) """
+    out = {}
+    for source in sources:
+        try:
+            out[source] = os.stat(source).st_mtime
+        except (OSError, TypeError):
+            out[source] = None
+    return out
+
+class Snapshot(object):
+    
+    """ A store of named, JSON-encodable tables, loaded lazily and
+        saved at exit -- but only if anything in it has actually changed.
+    """
+    
+    def __init__(self, directory=None, enabled=ENABLED):
+        self.directory = directory
+        self.enabled = enabled
+        self.tables = None
+        self.persisting = {}
+        self.dirty = False
+        self.registered = False
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def path(self):
+        directory = self.directory or cache_directory()
+        return os.path.join(directory, "snapshot-%s.json" % python_version())
+    
+    def load(self):
+        """ Read the snapshot file -- once -- discarding it wholesale
+            if it’s unreadable or was written by a different version
+            of either this module or Python itself
+        """
+        if self.tables is None:
+            self.tables = {}
+            if self.enabled:
+                try:
+                    with open(self.path, 'r') as handle:
+                        loaded = json.load(handle)
+                except (IOError, OSError, ValueError):
+                    pass
+                else:
+                    if loaded.get('version') == SNAPSHOT_VERSION and \
+                       loaded.get('python') == python_version():
+                        self.tables = loaded.get('tables') or {}
+        return self.tables
+    
+    def valid(self, name, sources):
+        """ Does the named table exist, with its sources’ mtimes unchanged? """
+        entry = self.load().get(name)
+        if entry is None:
+            return False
+        return entry.get('mtimes') == mtimes_for(sources)
+    
+    def get(self, name, builder, sources=(), decode=None, encode=None):
+        """ Return the named table: loaded from the snapshot if it’s valid,
+            or else freshly built with `builder()` and stored for next time.
+            
+            The optional `decode` and `encode` functions convert between
+            the snapshotted data and what `builder()` returns; a table
+            that fails to decode gets rebuilt.
+        """
+        sources = tuple(sources)
+        if self.valid(name, sources):
+            data = self.tables[name]['data']
+            try:
+                value = data if decode is None else decode(data)
+            except Exception:
+                pass
+            else:
+                self.hits += 1
+                return value
+        self.misses += 1
+        value = builder()
+        self.put(name, value if encode is None else encode(value), sources)
+        return value
+    
+    def put(self, name, data, sources=()):
+        """ Store some JSON-encodable data as the named table """
+        self.load()[name] = { 'mtimes' : mtimes_for(sources),
+                              'data'   : data }
+        self.dirty = True
+        self.register()
+    
+    def persist(self, name, getter, sources=()):
+        """ Call `getter()` when the snapshot is saved, and store its
+            return value as the named table -- for tables that accumulate
+            over the course of a session, like the clade dispatch table.
+        """
+        self.persisting[name] = (getter, tuple(sources))
+        self.register()
+    
+    def register(self):
+        if self.enabled and not self.registered:
+            atexit.register(self.save)
+            self.registered = True
+    
+    def save(self):
+        """ Write the snapshot out, if enabled and in need of writing,
+            via a temporary file so as never to leave a partial snapshot
+        """
+        if not self.enabled:
+            return None
+        for name, (getter, sources) in self.persisting.items():
+            data = getter()
+            entry = self.load().get(name)
+            if entry is None or entry.get('data') != data or \
+                                entry.get('mtimes') != mtimes_for(sources):
+                self.put(name, data, sources)
+        if not self.dirty:
+            return None
+        path = self.path
+        directory = os.path.dirname(path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            temporary = "%s.%i.tmp" % (path, os.getpid())
+            with open(temporary, 'w') as handle:
+                json.dump({ 'version'   : SNAPSHOT_VERSION,
+                            'python'    : python_version(),
+                            'tables'    : self.tables }, handle)
+            os.rename(temporary, path)
+        except (IOError, OSError):
+            return None
+        self.dirty = False
+        return path
+    
+    def clear(self):
+        """ Forget every table, and remove the snapshot file """
+        self.tables = {}
+        self.dirty = False
+        try:
+            os.unlink(self.path)
+        except (IOError, OSError):
+            pass
+    
+    def __repr__(self):
+        return "%s(%s, tables=%i, hits=%i, misses=%i)" % (type(self).__name__,
+                                                         self.path,
+                                                         len(self.load()),
+                                                         self.hits,
+                                                         self.misses)
+
+snapshot = Snapshot()
+
+__all__ = ('Snapshot', 'snapshot',
+           'cache_directory', 'python_version', 'mtimes_for',
+           'SNAPSHOT_VERSION', 'ENABLED')
+__dir__ = lambda: list(__all__)
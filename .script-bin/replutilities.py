@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- encoding: utf-8 -*-
 from __future__ import print_function
-from collections import Counter, OrderedDict
+from collections import Counter, OrderedDict, namedtuple
 from enum import Enum, unique, _is_dunder as ispyname
 from itertools import chain
 import sys, os
@@ -22,6 +22,9 @@ MAXINT = getattr(sys, 'maxint',
 # Determine if our Python is three’d up:
 PY3 = sys.version_info.major > 2
 
+# Determine if module-level `__getattr__(…)` works (q.v. PEP 562):
+PEP562 = sys.version_info >= (3, 7)
+
 # Determine if we’re on PyPy:
 PYPY = hasattr(sys, 'pypy_version_info')
 
@@ -33,7 +36,15 @@ import argparse
 import array
 import contextlib
 import decimal
+import threading
+import time
 import warnings
+import weakref
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 class AutoType(object):
     
@@ -259,11 +270,14 @@ NotImplementedType = type(NotImplemented)
 SINGLETON_TYPES = (bool, NoneType, EllipsisType, NotImplementedType)
 
 def predicates_for_types(*types):
-    """ For a list of types, return a list of “isinstance” predicates """
-    predicates = []
-    for classtype in frozenset(types):
-        predicates.append(lambda thing: isinstance(thing, classtype))
-    return tuple(predicates)
+    """ For a list of types, return a tuple containing one precompiled
+        “isinstance” predicate covering all of them -- or an empty tuple,
+        if no types were passed
+    """
+    if not types:
+        return tuple()
+    typelist = tuple(types)
+    return (lambda thing: isinstance(thing, typelist),)
 
 @unique
 class Clade(Enum):
@@ -286,13 +300,42 @@ class Clade(Enum):
     
     @classmethod
     def of(cls, thing, name_hint=None):
+        """ Classify a thing, returning the first Clade whose predicates
+            match it. Things whose type has been seen before are classified
+            with a single lookup in the `clade_dispatch` table – q.v. the
+            `dispatch(…)` class method sub. – unless that type’s clade
+            depends on the instance in question (e.g. lambdas vs. functions).
+        """
+        thingtype = type(thing)
+        if thingtype in clade_dispatch:
+            return clade_dispatch[thingtype]
+        # Try the precompiled “isinstance” checks first -- none of the
+        # instance-dependent clades (q.v. sub.) can match the instances
+        # of any clades’ typelist, so this is safe to do out of order:
+        for clade in cls:
+            if clade.typecheck(thing):
+                return cls.dispatch(thing, clade)
         for clade in cls:
             for predicate in clade.predicates:
                 if predicate(thing):
-                    return clade
+                    return cls.dispatch(thing, clade)
         thing_hinted_name = name_hint or determine_name(thing)
         raise ValueError("can’t determine clade for thing: %s" % thing_hinted_name)
     
+    @classmethod
+    def dispatch(cls, thing, clade):
+        """ Record the clade for a things’ type in the `clade_dispatch`
+            table, if said clade can be determined from the type alone --
+            q.v. `INSTANCE_DEPENDENT_CLADES` and `ATTRIBUTE_DEPENDENT_CLADES`
+            sub. Returns the clade, unchanged.
+        """
+        if clade in INSTANCE_DEPENDENT_CLADES or isclasstype(thing):
+            return clade
+        if clade in ATTRIBUTE_DEPENDENT_CLADES and haspyattr(thing, 'dict'):
+            return clade
+        clade_dispatch[type(thing)] = clade
+        return clade
+    
     @classmethod
     def for_string(cls, string):
         for clade in cls:
@@ -313,6 +356,8 @@ class Clade(Enum):
             predicates = predicates[1:]
             if not all(isclasstype(putative) for putative in typelist):
                 raise TypeError("non-class-type item in clade definition")
+        self.typelist = typelist
+        self.typecheck = (predicates_for_types(*typelist) or (never,))[0]
         self.predicates = predicates_for_types(*typelist) + tuple(predicates)
     
     def to_string(self):
@@ -327,6 +372,23 @@ class Clade(Enum):
     def __repr__(self):
         return "%s.%s" % (pyattr(type(self), 'qualname', 'name'), self.name)
 
+# Clades for which different instances of the same type can classify
+# differently – classes and metaclasses are both instances of `type`,
+# and lambdas and functions are both instances of `types.FunctionType`:
+INSTANCE_DEPENDENT_CLADES = frozenset({ Clade.CLASS, Clade.METACLASS,
+                                        Clade.LAMBDA, Clade.FUNCTION })
+
+# Clades decided by whether or not a thing has certain attributes – which
+# is up to the thing itself, if it has a `__dict__` of its own (e.g. the
+# “operator” module has a `__getitem__`, whereas the “json” module does
+# not), and otherwise up to its type:
+ATTRIBUTE_DEPENDENT_CLADES = frozenset({ Clade.ITERABLE, Clade.INSTANCE })
+
+# The type-keyed dispatch table used by `Clade.of(…)`, mapping types to
+# the clades of their instances -- q.v. `Clade.dispatch(…)` supra. The
+# types are weakly referenced, so the table doesn’t keep them alive:
+clade_dispatch = weakref.WeakKeyDictionary()
+
 class ExportError(NameError):
     pass
 
@@ -340,25 +402,100 @@ class NoDefault(object):
 
 case_sort = lambda c: c.lower() if c.isupper() else c.upper()
 
+class Deferred(object):
+    
+    """ A placeholder for an exported thing that won’t get created until
+        it’s first accessed -- q.v. `Exporter.defer(…)` sub.
+    """
+    __slots__ = ('factory', 'doc')
+    
+    def __init__(self, factory, doc=None):
+        self.factory = factory
+        self.doc = doc
+    
+    def __call__(self):
+        return self.factory()
+    
+    def __repr__(self):
+        return "%s(%s)" % (determine_name(type(self)),
+                           determine_name(self.factory))
+
+isdeferred = lambda thing: type(thing) is Deferred
+
 class Exporter(MutableMapping):
     
-    """ A class representing a list of things for a module to export. """
-    __slots__ = pytuple('exports', 'clades')
+    """ A class representing a list of things for a module to export.
+        
+        Pass `lazy=True` to defer the classification of exported things
+        until the clade histogram is actually asked for (e.g. by a call
+        to `print_diagnostics(…)`) -- at which point everything will be
+        classified in one pass, and the results kept until the next time
+        the export list changes.
+        
+        Things that are expensive to create can be exported with `defer(…)`,
+        which puts off their creation until they’re first accessed -- q.v.
+        the `module_getattr(…)` method sub. for the module-level hookup.
+    """
+    __slots__ = pytuple('exports', 'clades', 'lazy', 'namespace', 'deferrals')
     
-    def __init__(self):
+    def __init__(self, lazy=False):
         self.__exports__ = {}
-        self.__clades__ = Counter()
+        self.__lazy__ = bool(lazy)
+        self.__clades__ = None if self.__lazy__ else Counter()
+        self.__namespace__ = None
+        self.__deferrals__ = set()
     
     def exports(self):
-        """ Get a new dictionary instance filled with the exports. """
+        """ Get a new dictionary instance filled with the exports --
+            creating any deferred exports that have yet to be created.
+        """
         out = {}
-        out.update(self.__exports__)
+        for key in tuple(self.__exports__):
+            out[key] = self[key]
         return out
     
+    @property
+    def lazy(self):
+        """ Whether or not this Exporter defers classification """
+        return self.__lazy__
+    
     def clade_histogram(self):
         """ Return the histogram of clade counts. """
+        if self.__clades__ is None:
+            self.__clades__ = self.classify_all()
         return Counter(self.__clades__)
     
+    def classify_all(self):
+        """ Classify all of the exported things in one pass, returning
+            a new histogram of clade counts -- q.v. `classify(…)` sub.
+            Deferred exports that have yet to be created are left out,
+            just as a non-lazy Exporter leaves them out, q.v. `deferred()`.
+        """
+        histogram = Counter()
+        for named, thing in tuple(self.__exports__.items()):
+            if isdeferred(thing):
+                continue
+            try:
+                histogram[self.classify(thing, named=named)] += 1
+            except ValueError:
+                # no clade found
+                typename = determine_name(type(thing))
+                warnings.warn(type(self).messages['xclade'] % (named, typename),
+                              ExportWarning, stacklevel=2)
+        return histogram
+    
+    def deferred(self):
+        """ Get a tuple of the names of deferred exports that have yet
+            to be created -- and so have yet to be classified
+        """
+        return tuple(key for key, thing in self.__exports__.items() \
+                                        if isdeferred(thing))
+    
+    def invalidate(self):
+        """ Discard a lazy Exporters’ memoized clade histogram """
+        if self.__lazy__:
+            self.__clades__ = None
+    
     messages = {
         'docstr'    : "Can’t set the docstring for thing “%s” of type %s:",
         'xclade'    : "Can’t determine a clade for thing “%s” of type %s",
@@ -393,16 +530,24 @@ class Exporter(MutableMapping):
     
     def values(self):
         """ Get a value view on the exported items dictionary. """
-        return self.__exports__.values()
+        return self.exports().values()
     
     def get(self, key, default=NoDefault):
+        if key in self.__exports__:
+            return self[key]
         if default is NoDefault:
-            return self.__exports__.get(key)
-        return self.__exports__.get(key, default)
+            return None
+        return default
     
     def pop(self, key, default=NoDefault):
         if key in self.__exports__:
-            self.decrement_for_clade(self[key], named=key)
+            # Deferred exports are popped as-is, without being created:
+            thing = self.__exports__[key]
+            if self.__lazy__:
+                self.invalidate()
+            elif not isdeferred(thing):
+                self.decrement_for_clade(thing, named=key)
+            self.__deferrals__.discard(key)
         if default is NoDefault:
             return self.__exports__.pop(key)
         return self.__exports__.pop(key, default)
@@ -447,14 +592,24 @@ class Exporter(MutableMapping):
         if thing is self:
             raise ExportError("can’t export an exporter instance directly")
         
-        # Attempt to classify the item to a clade:
-        try:
-            self.increment_for_clade(thing, named=named)
-        except ValueError:
-            # no clade found
-            typename = determine_name(type(thing))
-            warnings.warn(type(self).messages['xclade'] % (named, typename),
-                          ExportWarning, stacklevel=2)
+        return self.stow(thing, named, doc=doc)
+    
+    def stow(self, thing, named, doc=None):
+        """ Classify, rename, document and store a thing, under a name
+            that’s already been vetted -- q.v. `export(…)` supra.
+        """
+        # Attempt to classify the item to a clade -- or, if we’re
+        # lazy, put that off until someone asks for the histogram:
+        if self.__lazy__:
+            self.invalidate()
+        else:
+            try:
+                self.increment_for_clade(thing, named=named)
+            except ValueError:
+                # no clade found
+                typename = determine_name(type(thing))
+                warnings.warn(type(self).messages['xclade'] % (named, typename),
+                              ExportWarning, stacklevel=3)
         
         # At this point, “named” is valid -- if we were passed
         # a lambda, try to rename it with either our valid name,
@@ -479,7 +634,7 @@ class Exporter(MutableMapping):
             except (AttributeError, TypeError):
                 typename = determine_name(type(thing))
                 warnings.warn(type(self).messages['docstr'] % (named, typename),
-                              ExportWarning, stacklevel=2)
+                              ExportWarning, stacklevel=3)
         
         # Stow the item in the global __exports__ dict:
         self.__exports__[named] = thing
@@ -487,6 +642,72 @@ class Exporter(MutableMapping):
         # Return the thing, unchanged (that’s how we decorate).
         return thing
     
+    def defer(self, factory, name, doc=None):
+        """ Add a thing to the export list, without creating it: the
+            thing will be created by calling `factory()` the first time
+            it’s accessed -- either through the Exporter, or as a module
+            attribute via the function returned by `module_getattr(…)`:
+                
+                def build_huge_table():
+                    …
+                    return huge_table
+                
+                exporter.defer(build_huge_table, name='huge_table')
+                …
+                __getattr__ = exporter.module_getattr(globals())
+            
+            N.B. module code that uses a deferred thing itself has to
+            go through the Exporter, e.g. `exporter['huge_table']`, as
+            module-level `__getattr__(…)` functions don’t get consulted
+            for lookups of global names. Deferred names are listed in the
+            module’s `__dir__`, but not its `__all__` -- as star-imports
+            would otherwise create them all, right off the bat.
+        """
+        if name is None:
+            raise ExportError("can’t defer an unnamed thing")
+        if name in self.__exports__:
+            raise ExportError("can’t re-export name “%s”" % name)
+        self.invalidate()
+        self.__exports__[name] = Deferred(factory, doc=doc)
+        self.__deferrals__.add(name)
+        return factory
+    
+    def materialize(self, key):
+        """ Create a deferred export by calling its factory, stowing the
+            result in place of the placeholder -- and in the namespace of
+            the module, if one was passed to `module_getattr(…)`
+        """
+        deferred = self.__exports__[key]
+        if not isdeferred(deferred):
+            return deferred
+        thing = self.stow(deferred(), key, doc=deferred.doc)
+        if self.__namespace__ is not None:
+            self.__namespace__[key] = thing
+        return thing
+    
+    def module_getattr(self, namespace):
+        """ Return a PEP 562 module-level `__getattr__(…)` function, which
+            creates deferred exports on first access, e.g.:
+                
+                __getattr__ = exporter.module_getattr(globals())
+            
+            … On Pythons that predate PEP 562 (and will therefore ignore
+            a module-level `__getattr__(…)`) all deferred exports are
+            created immediately, and stuck into the module namespace.
+        """
+        self.__namespace__ = namespace
+        
+        def __getattr__(key):
+            if key not in self.__exports__:
+                raise AttributeError("module “%s” has no attribute “%s”" % (
+                                      namespace.get('__name__'), key))
+            return self.materialize(key)
+        
+        if not PEP562:
+            for key in tuple(self.__exports__):
+                self.materialize(key)
+        return __getattr__
+    
     def decorator(self):
         """ Return a reference to this Exporter instances’ “export”
             method, suitable for use as a decorator, e.g.:
@@ -505,11 +726,17 @@ class Exporter(MutableMapping):
         return self.export
     
     def __call__(self):
-        """ Exporter instances are callable, for use in `__all__` definitions """
-        return tuple(self.keys())
+        """ Exporter instances are callable, for use in `__all__` definitions --
+            names exported with `defer(…)` are left out, so that a star-import
+            won’t create every last one of them, q.v. `dir_function()` sub.
+        """
+        return tuple(key for key in self.keys() if key not in self.__deferrals__)
     
     def dir_function(self):
-        """ Return a list containing the exported module names. """
+        """ Return a list containing the exported module names -- all of
+            them, including those exported with `defer(…)`, which are left
+            out of `__all__` but are still there for the asking
+        """
         return list(self.keys())
     
     def all_and_dir(self):
@@ -536,7 +763,7 @@ class Exporter(MutableMapping):
     
     def cache_info(self):
         """ Shortcut to get the CacheInfo namedtuple from the
-            cached internal `thingname_search_by_id(…)` function,
+            indexed internal `thingname_search_by_id(…)` function,
             which is used in last-resort name lookups made by
             `determine_name(…)` during `export(…)` calls.
         """
@@ -546,10 +773,12 @@ class Exporter(MutableMapping):
         """ Print out a prettified (IMHO at any rate) representation of
             the current module export list.
             
-            N.B. This function is a fucking illegible mess at the moment
+            N.B. This function is a fucking illegible mess at the moment --
+            and deferred exports are printed as their placeholders, so as
+            not to create them merely for the sake of printing them out
         """
         from pprint import pformat
-        exports = self.exports()
+        exports = self.__exports__
         keys = sorted(exports.keys(), key=case_sort, reverse=True)
         vals = (getitem(exports, key) for key in keys)
         print_separator()
@@ -571,7 +800,7 @@ class Exporter(MutableMapping):
             ---------------------------------------------------------------------------------
             ≠≠≠ CLASSIFICATION HISTOGRAM
             ≠≠≠ Clades: 8 (of 12)
-            ≠≠≠ Things: 102 total, 0 unclassified
+            ≠≠≠ Things: 102 total, 2 deferred, 0 unclassified
             
             00 → [       LAMBDA ] → 46 • 45% ••••••••••••••••••••••••••••••••••••••••••••••
             01 → [     FUNCTION ] → 28 • 27% ••••••••••••••••••••••••••••
@@ -589,11 +818,13 @@ class Exporter(MutableMapping):
         """
         clade_histogram = self.clade_histogram()
         total = sum(clade_histogram.values())
-        unclassified = len(self) - total
+        deferred = len(self.deferred())
+        unclassified = len(self) - total - deferred
         print_separator()
         print("≠≠≠ CLASSIFICATION HISTOGRAM")
         print("≠≠≠ Clades: %i (of %i)" % (len(clade_histogram), len(Clade)))
-        print("≠≠≠ Things: %i total, %i unclassified" % (total, unclassified))
+        print("≠≠≠ Things: %i total, %i deferred, %i unclassified" % (total, deferred,
+                                                                      unclassified))
         print()
         for idx, (clade, count) in enumerate(sorted(clade_histogram.items(),
                                                     key=lambda item: item[1],
@@ -622,12 +853,11 @@ class Exporter(MutableMapping):
     
     def print_diagnostics(self, module_all, module_dir):
         """ Pretty-print the current list of exported things """
-        # Sanity-check the modules’ __dir__ and __all__ attributes
-        exports = self.exports()
-        
-        assert list(module_all) == module_dir()
-        assert len(module_all) == len(module_dir())
-        assert len(module_all) == len(exports)
+        # Sanity-check the modules’ __dir__ and __all__ attributes --
+        # without creating any deferred exports in the process:
+        assert list(module_all) == [key for key in module_dir() \
+                                         if key not in self.__deferrals__]
+        assert len(module_dir()) == len(self)
         
         # Pretty-print the export list
         self._print_export_list()
@@ -653,22 +883,33 @@ class Exporter(MutableMapping):
         return key in self.__exports__
     
     def __getitem__(self, key):
-        return self.__exports__[key]
+        thing = self.__exports__[key]
+        if isdeferred(thing):
+            return self.materialize(key)
+        return thing
     
     def __setitem__(self, key, value):
-        if key in self.__exports__:
-            self.decrement_for_clade(self[key], named=key)
-        self.increment_for_clade(value, named=key)
+        self.__deferrals__.discard(key)
+        if self.__lazy__:
+            self.invalidate()
+        else:
+            if key in self.__exports__ and not isdeferred(self.__exports__[key]):
+                self.decrement_for_clade(self[key], named=key)
+            self.increment_for_clade(value, named=key)
         self.__exports__[key] = value
     
     def __delitem__(self, key):
-        self.decrement_for_clade(self[key], named=key)
+        self.__deferrals__.discard(key)
+        if self.__lazy__:
+            self.invalidate()
+        elif not isdeferred(self.__exports__[key]):
+            self.decrement_for_clade(self[key], named=key)
         del self.__exports__[key]
     
     def __bool__(self):
         return len(self.__exports__) > 0
 
-exporter = Exporter()
+exporter = Exporter(lazy=True)
 export = exporter.decorator()
 
 # MODULE SEARCH FUNCTIONS: iterate and search modules, yielding
@@ -714,11 +955,27 @@ def itermoduleids(module):
     """ Internal function to get an iterable of `(name, id(thing))`
         tuples for all things comntained in a given module – q.v.
         `itermodule(…)` implementation supra.
+        
+        Modules with a `__dict__` are read straight out of it, and so
+        without ever calling a module-level `__getattr__(…)` -- which
+        would otherwise create any and all deferred exports (q.v.
+        `Exporter.module_getattr(…)` supra.) just to look at them.
+        Those get found once something else has created them.
     """
-    keys = tuple(key for key in dir(module) \
-                      if key not in BUILTINS)
-    ids = (id(getattr(module, key)) for key in keys)
-    return zip(keys, ids)
+    namespace = getattr(module, '__dict__', None)
+    if namespace is not None:
+        for key, thing in sorted(tuple(namespace.items()), key=lambda item: item[0]):
+            if key not in BUILTINS:
+                yield key, id(thing)
+        return
+    for key in dir(module):
+        if key in BUILTINS:
+            continue
+        try:
+            thing = getattr(module, key)
+        except Exception:
+            continue
+        yield key, id(thing)
 
 # UTILITY FUNCTIONS: helpers for builtin container types:
 
@@ -737,19 +994,387 @@ def listify(*items):
     """ Return a new list containing all non-`None` arguments """
     return list(item for item in items if item is not None)
 
-# Q.v. `thingname_search_by_id(…)` function sub.
-cache = lru_cache(maxsize=128, typed=False)
+# Modules bound by `importlib.util.LazyLoader` are instances of this type
+# until they’re loaded -- which touching any of their attributes will do:
+try:
+    from importlib.util import _LazyModule as LazyModuleType
+except ImportError:
+    LazyModuleType = None
+
+# N.B. `type(…)` is used rather than `isinstance(…)`, which would go on to
+# ask the module for its `__class__` -- and thereby load it:
+islazymodule = lambda thing: LazyModuleType is not None and \
+                             type(thing) is LazyModuleType
 
 # This goes against all logic and reason, but it fucking seems
 # to fix the problem of constants, etc showing up erroneously
 # as members of the `__console__` or `__main__` modules –
 # a problem which, I should mention, is present in the operation
-# of the `pickle.whichmodule(…)` function (!)
-sysmods = lambda: reversed(uniquify(*sys.modules.values()))
+# of the `pickle.whichmodule(…)` function (!) -- lazy modules that
+# haven’t been loaded yet are left out, so as to stay that way:
+sysmods = lambda: reversed(uniquify(*(module for module in sys.modules.values() \
+                                              if not islazymodule(module))))
+
+class ModuleWatcher(object):
+    
+    """ A do-nothing `sys.meta_path` finder, which counts the imports
+        that pass through it -- each and every import of a module that
+        isn’t already in `sys.modules` asks all the meta-path finders
+        about it, so the count changes whenever the module set might.
+        
+        The `generation()` value also incorporates `len(sys.modules)`,
+        to catch the modules that get added or deleted by hand.
+    """
+    __slots__ = pytuple('imports')
+    
+    def __init__(self):
+        self.__imports__ = 0
+    
+    def find_spec(self, fullname, path=None, target=None):
+        """ Count the import attempt, and let some other finder do the work """
+        self.__imports__ += 1
+        return None
+    
+    def find_module(self, fullname, path=None):
+        """ Python 2.x-style finder API, q.v. `find_spec(…)` supra. """
+        self.__imports__ += 1
+        return None
+    
+    def generation(self):
+        """ Return a value that changes when the module set does """
+        return (self.__imports__, len(sys.modules))
+    
+    def install(self):
+        """ Install this watcher at the head of `sys.meta_path`, replacing
+            any previously-installed watcher (e.g. from a module reload)
+        """
+        sys.meta_path[:] = [finder for finder in sys.meta_path \
+                                    if type(finder).__name__ != type(self).__name__]
+        sys.meta_path.insert(0, self)
+        return self
+
+# The module-wide `sys.meta_path` watcher instance:
+module_watcher = ModuleWatcher().install()
+
+# Q.v. `ThingnameIndex.cache_info()` sub.
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+class ThingnameIndex(object):
+    
+    """ An incrementally-maintained reverse index, mapping the `id(…)`
+        values of things found in imported modules to `(module, name)`
+        tuples – q.v. `thingname_search_by_id(…)` sub.
+        
+        The index is built on the first lookup, and thereafter it is
+        only extended: on a lookup miss, the modules that have shown
+        up in `sys.modules` since the last update get scanned, as do
+        any already-indexed modules whose `__dict__` has changed size
+        (which is what happens to a module that is in the middle of
+        being imported, like e.g. one that is calling `export(…)` --
+        or to `__main__` in a REPL session). The list of modules is
+        only recomputed when the `ModuleWatcher` says the module set
+        has changed; entries for modules that have been removed from
+        `sys.modules` get purged at that point. Lazy modules are left
+        alone until something else loads them, q.v. `sysmods()` supra.
+        
+        Hits are verified before they’re returned: an entry whose
+        module attribute no longer has the `id(…)` in question (as
+        happens when a thing dies, and its `id(…)` gets reused) is
+        evicted and treated as a miss. Things passed to `track(…)`
+        are also evicted via weakref callback, as soon as they die.
+        Between the two, the index can be unbounded and still right.
+        
+        Module scans can optionally be farmed out to a thread pool, with
+        early cancellation and a per-module timeout – q.v. `configure(…)`
+        sub., and the `THINGNAME_WORKERS` environment variable.
+    """
+    __slots__ = pytuple('index', 'generations', 'modules', 'watcher', 'watched',
+                        'lazy', 'refs', 'stalled', 'workers', 'timeout',
+                        'hits', 'misses', 'evictions')
+    
+    def __init__(self, watcher=None):
+        self.__watcher__ = watcher or module_watcher
+        self.__index__ = {}
+        self.__generations__ = {}
+        self.__modules__ = tuple()
+        self.__watched__ = None
+        self.__lazy__ = tuple()
+        self.__refs__ = {}
+        self.__stalled__ = set()
+        self.__workers__ = 0
+        self.__timeout__ = 0.25
+        self.__hits__ = 0
+        self.__misses__ = 0
+        self.__evictions__ = 0
+    
+    @staticmethod
+    def generation(module):
+        """ Return a cheap value that changes when a modules’ contents do """
+        return len(getattr(module, '__dict__', None) or dir(module))
+    
+    @staticmethod
+    def peek(module, key):
+        """ Get a module attribute without firing any properties or
+            module-level `__getattr__(…)` hooks, where possible
+        """
+        namespace = getattr(module, '__dict__', None)
+        if namespace is not None:
+            return namespace.get(key, NoDefault)
+        return getattr(module, key, NoDefault)
+    
+    def refresh(self):
+        """ Recompute the list of modules to scan, if the module set has
+            changed -- purging all index entries for departed modules.
+            Returns True if the module list was recomputed.
+        """
+        generation = self.__watcher__.generation()
+        if generation == self.__watched__ and \
+            all(islazymodule(module) for module in self.__lazy__):
+            return False
+        self.__watched__ = generation
+        self.__lazy__ = tuple(module for module in sys.modules.values() \
+                                      if islazymodule(module))
+        # Would you believe that the uniquify(…) call is absolutely
+        # fucking necessary to use on `sys.modules`?! I checked and
+        # on my system, like on all my REPLs, uniquifying the modules
+        # winnowed the module list (and therefore, this functions’
+        # search space) by around 100 fucking modules (!) every time!!
+        self.__modules__ = tuple(sysmods())
+        present = frozenset(id(module) for module in self.__modules__)
+        departed = frozenset(self.__generations__) - present
+        if departed:
+            for moduleID in departed:
+                del self.__generations__[moduleID]
+            for thingID, (module, _) in tuple(self.__index__.items()):
+                if id(module) in departed:
+                    self.evict(thingID)
+        return True
+    
+    def stale(self, module):
+        """ Return True if a module needs (re-)scanning into the index """
+        return self.__generations__.get(id(module)) != self.generation(module)
+    
+    def ingest(self, module, generation, pairs):
+        """ Merge `(name, id(thing))` pairs from a module into the index """
+        self.__generations__[id(module)] = generation
+        for key, valueID in pairs:
+            # First come, first served -- just like the
+            # linear search this index replaces:
+            self.__index__.setdefault(valueID, (module, key))
+    
+    def configure(self, workers=None, timeout=None):
+        """ Opt into (or out of) parallel module scanning: with `workers`
+            greater than zero, index updates are spread across a thread
+            pool of that size. A module whose scan runs longer than
+            `timeout` seconds -- as can happen with a pathological
+            module-level `__getattr__(…)` or lazy-import hook -- is
+            abandoned for that update, and retried on the next miss.
+            Pass `workers=0` to go back to serial scanning.
+        """
+        if workers is not None:
+            self.__workers__ = max(int(workers), 0)
+        if timeout is not None:
+            self.__timeout__ = float(timeout)
+        return self
+    
+    def update(self, thingID=None):
+        """ Scan all new (or newly-grown) modules into the index.
+            Returns the number of modules that were scanned.
+            
+            In parallel mode, passing an `id(thing)` value cancels any
+            outstanding scans once that thing has been found -- the
+            modules that went unscanned will be picked up by the next
+            update, whenever that happens.
+        """
+        self.refresh()
+        self.__stalled__.clear()
+        todo = tuple(module for module in self.__modules__ if self.stale(module))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if self.__workers__ and len(todo) > 1:
+                return self.update_parallel(todo, thingID)
+            for module in todo:
+                self.ingest(module, self.generation(module),
+                                    itermoduleids(module))
+        return len(todo)
+    
+    def update_parallel(self, todo, thingID=None):
+        """ Scan modules into the index using a pool of daemon threads --
+            q.v. `configure(…)` and `update(…)` supra. Daemon threads are
+            used (instead of e.g. `concurrent.futures`) so that a scan
+            stuck in some module’s `__getattr__(…)` can’t block exit.
+            
+            Results are merged strictly in `todo` order, as each prefix
+            of the module list finishes -- scans that finish after an
+            early stop, out past the merged prefix, are thrown away, and
+            their modules stay stale until the next update. Abandoned
+            modules are recorded in `__stalled__` for the duration.
+        """
+        timeout = self.__timeout__
+        stop = threading.Event()
+        tasks = queue.Queue()
+        finished = queue.Queue()
+        started = {}
+        
+        for idx, module in enumerate(todo):
+            tasks.put((idx, module))
+        
+        def scan(idx, module):
+            generation = self.generation(module)
+            pairs = []
+            for pair in itermoduleids(module):
+                if stop.is_set():
+                    return None
+                if time.time() - started[idx] > timeout:
+                    return NoDefault
+                pairs.append(pair)
+            return generation, pairs
+        
+        def worker():
+            while not stop.is_set():
+                try:
+                    idx, module = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                started[idx] = time.time()
+                finished.put((idx, scan(idx, module)))
+        
+        def spawn(count):
+            for _ in range(count):
+                thread = threading.Thread(target=worker, name='thingname-scan')
+                thread.daemon = True
+                thread.start()
+        
+        results = {}
+        accounted = set()
+        merged = scanned = 0
+        found = False
+        spawn(min(self.__workers__, len(todo)))
+        
+        swept = time.time()
+        
+        while merged < len(todo) and not found:
+            try:
+                idx, result = finished.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                if idx not in accounted:
+                    accounted.add(idx)
+                    if result is NoDefault:
+                        self.__stalled__.add(id(todo[idx]))
+                    else:
+                        results[idx] = result
+            
+            # Abandon any scans that have been running for too long,
+            # replacing their stuck worker threads with fresh ones:
+            now = time.time()
+            if now - swept > timeout:
+                swept = now
+                stuck = [idx for idx, when in tuple(started.items()) \
+                                  if idx not in accounted and now - when > timeout]
+                for idx in stuck:
+                    self.__stalled__.add(id(todo[idx]))
+                    accounted.add(idx)
+                spawn(len(stuck))
+            
+            # Merge in module order, so the results match a serial scan:
+            while merged < len(todo) and merged in accounted:
+                result = results.pop(merged, None)
+                if result is not None:
+                    self.ingest(todo[merged], *result)
+                    scanned += 1
+                    if thingID is not None and \
+                        any(valueID == thingID for _, valueID in result[1]):
+                        found = True
+                merged += 1
+        
+        stop.set()
+        return scanned
+    
+    def evict(self, thingID, *args):
+        """ Remove the entry for an `id(thing)` value, if there is one.
+            Extra positional arguments are ignored, so that this method
+            can be used as the body of a weakref callback.
+        """
+        self.__refs__.pop(thingID, None)
+        if self.__index__.pop(thingID, None) is not None:
+            self.__evictions__ += 1
+    
+    def track(self, thing):
+        """ Evict the entry for a thing as soon as that thing dies """
+        thingID = id(thing)
+        if thingID in self.__refs__ or thingID not in self.__index__:
+            return
+        try:
+            self.__refs__[thingID] = weakref.ref(thing,
+                                     lambda ref: self.evict(thingID))
+        except TypeError:
+            # Not weakref-able -- verification on lookup will have to do:
+            pass
+    
+    def verify(self, thingID):
+        """ Return True if the index entry for an `id(thing)` value is
+            still accurate, evicting the entry and returning False if not --
+            N.B. entries are checked by way of `peek(…)`, which reads module
+            namespaces just as `itermoduleids(…)` does when they get indexed
+        """
+        module, key = self.__index__[thingID]
+        if id(self.peek(module, key)) == thingID:
+            return True
+        self.evict(thingID)
+        return False
+    
+    def lookup(self, thingID):
+        """ Return the `(module, name)` tuple for an `id(thing)` value,
+            or `(None, None)` if the thing can’t be found anywhere.
+        """
+        self.refresh()
+        if thingID in self.__index__ and self.verify(thingID):
+            self.__hits__ += 1
+            return self.__index__[thingID]
+        self.__misses__ += 1
+        if self.update(thingID):
+            return self.__index__.get(thingID, (None, None))
+        return None, None
+    
+    def cache_info(self):
+        """ Return a “CacheInfo” namedtuple, á la `functools.lru_cache(…)` """
+        return CacheInfo(self.__hits__,
+                         self.__misses__, None,
+                         len(self.__index__))
+    
+    def cache_clear(self):
+        """ Empty the index and reset the hit/miss statistics """
+        self.__index__.clear()
+        self.__generations__.clear()
+        self.__refs__.clear()
+        self.__stalled__.clear()
+        self.__modules__ = tuple()
+        self.__watched__ = None
+        self.__lazy__ = tuple()
+        self.__hits__ = 0
+        self.__misses__ = 0
+        self.__evictions__ = 0
+    
+    @property
+    def evictions(self):
+        """ The number of stale entries evicted from the index """
+        return self.__evictions__
+    
+    def __len__(self):
+        return len(self.__index__)
+    
+    def __contains__(self, thingID):
+        return thingID in self.__index__
+
+# The module-wide reverse index instance -- set e.g. THINGNAME_WORKERS=8
+# in the environment to opt into parallel module scanning:
+thingname_index = ThingnameIndex().configure(
+                  workers=int(os.environ.get('THINGNAME_WORKERS', '0'), base=10))
 
-@cache
 def thingname_search_by_id(thingID):
-    """ Cached function to find the name of a thing, according
+    """ Indexed function to find the name of a thing, according
         to what it is called in the context of a module in which
         it resides – searching across all currently imported
         modules in entirely, as indicated from the inspection of
@@ -761,20 +1386,13 @@ def thingname_search_by_id(thingID):
         implementdation of `determine_module(…)`, - also q.v.
         the calling function code sub.
         
-        Caching courtesy the `functools.lru_cache(…)` decorator.
+        Lookups courtesy the `ThingnameIndex` reverse index supra.
     """
-    # Would you believe that the uniquify(…) call is absolutely
-    # fucking necessary to use on `sys.modules`?! I checked and
-    # on my system, like on all my REPLs, uniquifying the modules
-    # winnowed the module list (and therefore, this functions’
-    # search space) by around 100 fucking modules (!) every time!!
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        for module in sysmods():
-            for key, valueID in itermoduleids(module):
-                if valueID == thingID:
-                    return module, key
-    return None, None
+    return thingname_index.lookup(thingID)
+
+# Expose the `functools.lru_cache(…)`-style cache-management API:
+thingname_search_by_id.cache_info = thingname_index.cache_info
+thingname_search_by_id.cache_clear = thingname_index.cache_clear
 
 @export
 def thingname_search(thing):
@@ -786,9 +1404,11 @@ def thingname_search(thing):
         
         This function may be called by `determine_name(…)`. Its
         subordinate internal function, `thingname_search_by_id(…)`,
-        uses the LRU cache from `functools`.
+        uses the incrementally-maintained `ThingnameIndex` reverse index.
     """
-    return thingname_search_by_id(id(thing))[1]
+    thingname = thingname_search_by_id(id(thing))[1]
+    thingname_index.track(thing)
+    return thingname
 
 @export
 def slots_for(cls):
@@ -979,31 +1599,91 @@ VERBOTEN += BUILTINS
 VERBOTEN += ('Namespace', 'SimpleNamespace')
 
 import types as thetypes
-types = Namespace()
 typed = re.compile(r"^(?P<typename>\w+)(?:Type)$")
 
-# Fill a Namespace with type aliases, minus the fucking 'Type' suffix --
-# We know they are types because they are in the fucking “types” module, OK?
-# And those irritating four characters take up too much pointless space, if
-# you asked me, which you implicitly did by reading the comments in my code,
-# dogg.
-
-for typename in dir(thetypes):
-    if typename.endswith('Type'):
-        setattr(types, typed.match(typename).group('typename'),
-        getattr(thetypes, typename))
-    elif typename not in VERBOTEN:
-        setattr(types, typename, getattr(thetypes, typename))
-
-# Substitute our own SimpleNamespace class, instead of the provided version:
-setattr(types, 'Namespace',       Namespace)
-setattr(types, 'SimpleNamespace', SimpleNamespace)
-
-# Manually set `types.__file__` and related attributes:
-setattr(types, '__file__',        __file__)
-setattr(types, '__cached__',      cache_from_source(__file__))
-setattr(types, '__package__',     os.path.splitext(
-                                  os.path.basename(__file__))[0])
+def build_types():
+    """ Build the `types` Namespace -- a deferred export, q.v. sub. """
+    types = Namespace()
+    
+    # Fill a Namespace with type aliases, minus the fucking 'Type' suffix --
+    # We know they are types because they are in the fucking “types” module, OK?
+    # And those irritating four characters take up too much pointless space, if
+    # you asked me, which you implicitly did by reading the comments in my code,
+    # dogg.
+    
+    for typename in dir(thetypes):
+        if typename.endswith('Type'):
+            setattr(types, typed.match(typename).group('typename'),
+            getattr(thetypes, typename))
+        elif typename not in VERBOTEN:
+            setattr(types, typename, getattr(thetypes, typename))
+    
+    # Substitute our own SimpleNamespace class, instead of the provided version:
+    setattr(types, 'Namespace',       Namespace)
+    setattr(types, 'SimpleNamespace', SimpleNamespace)
+    
+    # Manually set `types.__file__` and related attributes:
+    setattr(types, '__file__',        __file__)
+    setattr(types, '__cached__',      cache_from_source(__file__))
+    setattr(types, '__package__',     os.path.splitext(
+                                      os.path.basename(__file__))[0])
+    return types
+
+def module_mtime(modulename):
+    """ Return the mtime of a loaded modules’ file, or None """
+    try:
+        return os.stat(sys.modules[modulename].__file__).st_mtime
+    except (KeyError, AttributeError, TypeError, OSError):
+        return None
+
+def typename_for(thingtype):
+    """ Return a “module:qualname” string for a type """
+    return "%s:%s" % (thingtype.__module__, pyattr(thingtype, 'qualname', 'name'))
+
+def type_for(typename):
+    """ Return the type named by a “module:qualname” string -- as per
+        `typename_for(…)` supra. -- or None if it can’t be found amongst
+        the loaded modules (this function will not import anything)
+    """
+    modulename, _, qualname = typename.partition(':')
+    if modulename not in sys.modules or islazymodule(sys.modules[modulename]):
+        return None
+    thing = sys.modules[modulename]
+    for name in qualname.split('.'):
+        thing = getattr(thing, name, None)
+    if isclasstype(thing) and typename_for(thing) == typename:
+        return thing
+    # Many builtin types can only be found in the “types” module:
+    for thing in vars(thetypes).values():
+        if isclasstype(thing) and typename_for(thing) == typename:
+            return thing
+    return None
+
+def encode_clade_dispatch():
+    """ Encode the `clade_dispatch` table for the REPL snapshot, as a dict
+        of { “module:qualname” : [clade name, module mtime] } -- types
+        from `__main__`, or that can’t be found again by name, are skipped
+    """
+    out = {}
+    for thingtype, clade in tuple(clade_dispatch.items()):
+        if thingtype.__module__ == '__main__':
+            continue
+        typename = typename_for(thingtype)
+        if type_for(typename) is thingtype:
+            out[typename] = [clade.name, module_mtime(thingtype.__module__)]
+    return out
+
+def decode_clade_dispatch(data):
+    """ Decode a snapshotted `clade_dispatch` table, skipping those types
+        whose modules aren’t loaded, or have changed since -- q.v.
+        `replenv`, where the table gets seeded from the snapshot
+    """
+    out = {}
+    for typename, (cladename, mtime) in data.items():
+        thingtype = type_for(typename)
+        if thingtype is not None and module_mtime(thingtype.__module__) == mtime:
+            out[thingtype] = Clade[cladename]
+    return out
 
 @export
 def graceful_issubclass(thing, *cls_or_tuple):
@@ -1043,19 +1723,21 @@ iscontextmanager = lambda cls: allpyattrs(cls, 'enter', 'exit') or isabstractcon
 
 numeric_types = (int, float, decimal.Decimal)
 
-try:
-    import numpy
-
-except (ImportError, SyntaxError):
-    numpy = None
-    array_types = (array.ArrayType,
-                   bytearray, memoryview)
-
-else:
-    array_types = (numpy.ndarray,
-                   numpy.matrix,
-                   numpy.ma.MaskedArray, array.ArrayType,
-                                         bytearray, memoryview)
+def build_array_types():
+    """ Build the `array_types` tuple -- a deferred export, as importing
+        NumPy takes a while (when it’s available at all)
+    """
+    try:
+        import numpy
+    
+    except (ImportError, SyntaxError):
+        return (array.ArrayType,
+                bytearray, memoryview)
+    
+    return (numpy.ndarray,
+            numpy.matrix,
+            numpy.ma.MaskedArray, array.ArrayType,
+                                  bytearray, memoryview)
 
 try:
     from six import string_types
@@ -1067,18 +1749,24 @@ path_classes = tuplize(argparse.FileType, or_none(os, 'PathLike'), Path) # Path
 path_types = string_types + bytes_types + path_classes
 file_types = (io.TextIOBase, io.BufferedIOBase, io.RawIOBase, io.IOBase)
 
-callable_types = (types.Function,
-                  types.Method,
-                  types.Lambda,
-                  types.BuiltinFunction,
-                  types.BuiltinMethod)
-
-if PY3 and not PYPY:
-    callable_types += (
-                  types.Coroutine,
-                  types.ClassMethodDescriptor,
-                  types.MemberDescriptor,
-                  types.MethodDescriptor)
+def build_callable_types():
+    """ Build the `callable_types` tuple -- a deferred export, as it’s
+        derived from the contents of the `types` module
+    """
+    callable_types = (thetypes.FunctionType,
+                      thetypes.MethodType,
+                      thetypes.LambdaType,
+                      thetypes.BuiltinFunctionType,
+                      thetypes.BuiltinMethodType)
+    
+    if PY3 and not PYPY:
+        callable_types += (
+                      thetypes.CoroutineType,
+                      thetypes.ClassMethodDescriptorType,
+                      thetypes.MemberDescriptorType,
+                      thetypes.MethodDescriptorType)
+    
+    return callable_types
 
 
 ispathtype = lambda cls: issubclass(cls, path_types)
@@ -1102,11 +1790,11 @@ def ensure_path_is_valid(pth):
 
 isnumber = lambda thing: graceful_issubclass(thing, numeric_types)
 isnumeric = lambda thing: graceful_issubclass(thing, numeric_types)
-isarray = lambda thing: graceful_issubclass(thing, array_types)
+isarray = lambda thing: graceful_issubclass(thing, exporter['array_types'])
 isstring = lambda thing: graceful_issubclass(thing, string_types)
 isbytes = lambda thing: graceful_issubclass(thing, bytes_types)
-ismodule = lambda thing: graceful_issubclass(thing, types.Module)
-isfunction = lambda thing: isinstance(thing, (types.Function, types.Lambda)) or callable(thing)
+ismodule = lambda thing: graceful_issubclass(thing, thetypes.ModuleType)
+isfunction = lambda thing: isinstance(thing, (thetypes.FunctionType, thetypes.LambdaType)) or callable(thing)
 islambda = lambda thing: pyattr(thing, 'lambda_name', 'name', 'qualname') == LAMBDA
 ishashable = lambda thing: isinstance(thing, HashableABC)
 
@@ -1214,61 +1902,32 @@ def enumchoices(cls):
         return tuple()
     return tuple(choice.name for choice in cls)
 
-# TEXT UTILITIES: `sanitize(…)` to remove high-code-point glyphs
+# TEXT UTILITIES: `sanitize(…)` to remove high-code-point glyphs -- the
+# rule sets and their compiled engine all live in `replsanitize`, q.v. sub.
 
-@export
-def sanitize(text):
-    """ Remove specific unicode strings, in favor of ASCII-friendly versions """
-    sanitized = unicode(text)
-    for sanitizer, substitution in sanitize.sanitizers:
-        sanitized, _ = sanitizer.subn(substitution, sanitized)
-    return sanitized
-
-# Regular expression compiler shortcut:
-sanitize.re = lambda string: re.compile(string, re.MULTILINE)
-
-# Sanitization regexes and their replacement strings:
-sanitize.sanitizers = (
-    (sanitize.re(r"[“”]"),              '"'),
-    (sanitize.re(r"[‘’]"),              "'"),
-    (sanitize.re(r"[«»]"),              ":"),
-    (sanitize.re(r"[äáª]"),             "a"),
-    (sanitize.re(r"[ëé]"),              "e"),
-    (sanitize.re(r"[ïí]"),              "i"),
-    (sanitize.re(r"[öóº]"),             "o"),
-    (sanitize.re(r"[üú]"),              "u"),
-    (sanitize.re(r"‽"),                 "?!"),
-    (sanitize.re(r"¡"),                 "!"),
-    (sanitize.re(r"¿"),                 "?"),
-    (sanitize.re(r"±"),                 "+/-"),
-    (sanitize.re(r"÷"),                 "/"),
-    (sanitize.re(r"•"),                 "*"),
-    (sanitize.re(r"ˆ"),                 "^"),
-    (sanitize.re(r"†"),                 "<*>"),
-    (sanitize.re(r"‡"),                 "<**>"),
-    (sanitize.re(r"§"),                 "$"),
-    (sanitize.re(r"¥"),                 "Y"),
-    (sanitize.re(r"¢"),                 "c"),
-    (sanitize.re(r"ƒ"),                 "f"),
-    (sanitize.re(r"∫"),                 "S"),
-    (sanitize.re(r"ß"),                 "ss"),
-    (sanitize.re(r"ﬂ"),                 "fl"),
-    (sanitize.re(r"ﬁ"),                 "fi"),
-    (sanitize.re(r"£"),                 "lb."),
-    (sanitize.re(r""),                 "Apple"),
-    (sanitize.re(r"⌘"),                 "command"),
-    (sanitize.re(r"∞"),                 "infinity"),
-    (sanitize.re(r'√(?P<arg>[\w\d]*)'), 'sqrt(\g<arg>)'),
-    (sanitize.re(r"¶"),                 "[P]"),
-    (sanitize.re(r"[∂∆]"),              "d"),
-    (sanitize.re(r"Ø"),                 "0"),
-    (sanitize.re(r"→"),                 "->"),
-    (sanitize.re(r"¬"),                 "-]"),
-    (sanitize.re(r"…"),                 "..."),
-    (sanitize.re(r"©"),                 "(c)"),
-    (sanitize.re(r"®"),                 "(r)"),
-    (sanitize.re(r"™"),                 "(tm)"),
-    (sanitize.re(r"—"),                 "-"))
+from replsanitize import (sanitize_sequentially, compile_sanitizers,
+                          RuleSet, RuleSets, rulesets, compile_ruleset,
+                          benchmark_rulesets, sanitize_stream)
+
+def build_sanitize():
+    """ Build the `sanitize(…)` function -- a deferred export, so that
+        its regexes don’t get compiled until it’s first called upon
+    """
+    ruleset = rulesets['xcode-help']
+    
+    def sanitize(text):
+        """ Remove specific unicode strings, in favor of ASCII-friendly versions """
+        return sanitize.engine(text)
+    
+    # Sanitization regexes and their replacement strings, and the
+    # single-pass engine -- q.v. the “xcode-help” rule set in `replsanitize`:
+    sanitize.ruleset = ruleset
+    sanitize.engine = ruleset.compile()
+    sanitize.sanitizers = ruleset.sanitizers
+    
+    return sanitize
+
+exporter.defer(build_sanitize, name='sanitize')
 
 
 # THE MODULE EXPORTS:
@@ -1299,7 +1958,20 @@ export(ismergeable,     name='ismergeable',     doc="ismergeable(thing) → bool
 
 export(Clade)
 export(clademap,        name='clademap')
+export(RuleSet)
+export(RuleSets)
+export(rulesets,        name='rulesets')
+export(compile_ruleset, name='compile_ruleset')
+export(sanitize_sequentially)
+export(compile_sanitizers)
+export(benchmark_rulesets)
+export(sanitize_stream)
+export(clade_dispatch,  name='clade_dispatch')
 export(sysmods,         name='sysmods',         doc="sysmods() → shortcut for reversed(tuple(frozenset(sys.modules.values()))) …OK? I know. It’s not my finest work, but it works.")
+export(ThingnameIndex)
+export(thingname_index, name='thingname_index')
+export(ModuleWatcher)
+export(module_watcher,  name='module_watcher')
 
 export(always,          name='always',          doc="always(thing) → boolean predicate that always returns True")
 export(never,           name='never',           doc="never(thing) → boolean predicate that always returns False")
@@ -1334,11 +2006,13 @@ export(PYPY,            name='PYPY')
 export(QUALIFIER,       name='QUALIFIER')
 export(SEPARATOR_WIDTH, name='SEPARATOR_WIDTH')
 export(SINGLETON_TYPES, name='SINGLETON_TYPES')
+export(INSTANCE_DEPENDENT_CLADES, name='INSTANCE_DEPENDENT_CLADES')
+export(ATTRIBUTE_DEPENDENT_CLADES, name='ATTRIBUTE_DEPENDENT_CLADES')
 export(TEXTMATE,        name='TEXTMATE')
 export(VERBOTEN,        name='VERBOTEN')
 export(current_umask,   name='current_umask')
 
-export(types,           name='types',       doc=""" A Namespace instance containing aliases into the `types` module,
+exporter.defer(build_types, name='types', doc=""" A Namespace instance containing aliases into the `types` module,
                                                     sans the irritating and lexically unnecessary “Type” suffix --
                                                     e.g. `types.ModuleType` can be accessed as just `types.Module`
                                                     from this Namespace, which is less pointlessly redundant and far
@@ -1352,13 +2026,13 @@ export(iscontextmanager,                    doc="iscontextmanager(thing) → boo
 
 # NO DOCS ALLOWED:
 export(numeric_types)
-export(array_types)
+exporter.defer(build_array_types, name='array_types')
 export(bytes_types)
 export(string_types)
 export(path_classes)
 export(path_types)
 export(file_types)
-export(callable_types)
+exporter.defer(build_callable_types, name='callable_types')
 
 export(ispathtype,      name='ispathtype',  doc="ispathtype(thing) → boolean predicate, True if thing is a path type")
 export(ispath,          name='ispath',      doc="ispath(thing) → boolean predicate, True if thing seems to be path-ish instance")
@@ -1370,6 +2044,7 @@ export(isarray,         name='isarray',     doc="isarray(thing) → boolean pred
 export(isstring,        name='isstring',    doc="isstring(thing) → boolean predicate, True if thing is a string type or an instance of same")
 export(isbytes,         name='isbytes',     doc="isbytes(thing) → boolean predicate, True if thing is a bytes-like type or an instance of same")
 export(ismodule,        name='ismodule',    doc="ismodule(thing) → boolean predicate, True if thing is a module type or an instance of same")
+export(islazymodule,    name='islazymodule', doc="islazymodule(thing) → boolean predicate, True if thing is a lazy module that hasn’t yet been loaded")
 export(isfunction,      name='isfunction',  doc="isfunction(thing) → boolean predicate, True if thing is of a callable function type")
 export(islambda,        name='islambda',    doc="islambda(thing) → boolean predicate, True if thing is a function created with the «lambda» keyword")
 export(ishashable,      name='ishashable',  doc="ishashable(thing) → boolean predicate, True if thing can be hashed, via the builtin `hash(thing)`")
@@ -1380,6 +2055,9 @@ export(Exporter) # hahaaaaa
 # Assign the modules’ `__all__` and `__dir__` using the exporter:
 __all__, __dir__ = exporter.all_and_dir()
 
+# Create deferred exports on first access, via PEP 562:
+__getattr__ = exporter.module_getattr(globals())
+
 def test_attr_accessor():
     """ » Checking “attr(•) accessor …” """
     print(test_attr_accessor.__doc__)
@@ -1430,7 +2108,11 @@ def test_boolean_predicates():
     assert not isnumeric("2001e50")
     
     assert isarray(array.array)
-    if numpy is not None:
+    try:
+        import numpy
+    except (ImportError, SyntaxError):
+        pass
+    else:
         assert isarray(numpy.ndarray)
         assert isarray(numpy.array([0, 1, 2]))
     assert isstring(str)
@@ -1469,6 +2151,10 @@ def test_namespace_instance_docstring():
     print(test_namespace_instance_docstring.__doc__)
     print()
     
+    # “types” is a deferred export -- which, as a global name, it isn’t
+    # until something else has asked for it -- so ask the exporter:
+    types = exporter['types']
+    
     print_separator()
     print('types.__doc__ =')
     print()
@@ -1624,6 +2310,251 @@ def test_determine_module():
     print_separator()
     print()
 
+def test_lazy_module_scan():
+    """ » Checking that index misses leave lazy modules unloaded … """
+    print(test_lazy_module_scan.__doc__)
+    print()
+    
+    if LazyModuleType is None or 'colorsys' in sys.modules:
+        print("»»» no lazy modules to be had -- skipping")
+        print()
+        return
+    
+    from importlib.util import find_spec, module_from_spec, LazyLoader
+    spec = find_spec('colorsys')
+    spec.loader = LazyLoader(spec.loader)
+    colorsys = module_from_spec(spec)
+    sys.modules['colorsys'] = colorsys
+    spec.loader.exec_module(colorsys)
+    
+    try:
+        # A miss scans every module that’s changed -- but not this one:
+        assert thingname_search(object()) is None
+        assert islazymodule(colorsys)
+        
+        # … until something else loads it, whereupon it gets scanned:
+        rgb_to_hsv = colorsys.rgb_to_hsv
+        assert not islazymodule(colorsys)
+        assert thingname_search(rgb_to_hsv) == 'rgb_to_hsv'
+    finally:
+        del sys.modules['colorsys']
+    
+    print("»»» OK")
+    print()
+
+def test_deferred_export_scan():
+    """ » Checking that index misses leave deferred exports uncreated … """
+    print(test_deferred_export_scan.__doc__)
+    print()
+    
+    created = []
+    deferring = type(sys)('deferring')
+    deferring_exporter = Exporter()
+    deferring_exporter.defer(lambda: created.append(object()) or created[-1],
+                             name='huge_table')
+    deferring.__getattr__ = deferring_exporter.module_getattr(vars(deferring))
+    sys.modules['deferring'] = deferring
+    
+    try:
+        # A miss scans the module, without calling its `__getattr__(…)`:
+        index = ThingnameIndex()
+        assert index.lookup(id(object())) == (None, None)
+        assert not created
+        assert deferring_exporter.deferred() == ('huge_table',)
+        
+        # … and once the deferred export gets created, it can be found:
+        huge_table = deferring.huge_table
+        assert created == [huge_table]
+        assert index.lookup(id(huge_table)) == (deferring, 'huge_table')
+    finally:
+        del sys.modules['deferring']
+    
+    print("»»» OK")
+    print()
+
+def test_star_import():
+    """ » Checking that `from replutilities import *` creates nothing deferred … """
+    print(test_star_import.__doc__)
+    print()
+    
+    import subprocess
+    
+    # A fresh interpreter, as NumPy will have long since been imported here:
+    script = "\n".join(("import sys",
+                        "from replutilities import *",
+                        "import replutilities",
+                        "assert 'numpy' not in sys.modules",
+                        "assert 'types' not in globals()",
+                        "assert 'types' in dir(replutilities)",
+                        "assert 'types' in replutilities.exporter.deferred()"))
+    assert subprocess.call((sys.executable, '-W', 'ignore', '-c', script),
+                           cwd=os.path.dirname(os.path.abspath(__file__))) == 0
+    
+    print("»»» OK")
+    print()
+
+def test_getattr_module_lookup():
+    """ » Checking lookups against a module with a `__getattr__(…)` hook … """
+    print(test_getattr_module_lookup.__doc__)
+    print()
+    
+    thing = object()
+    served = []
+    hooked = type(sys)('hooked')
+    
+    def __getattr__(key):
+        if key != 'thing':
+            raise AttributeError(key)
+        served.append(key)
+        return thing
+    
+    hooked.__getattr__ = __getattr__
+    hooked.__dir__ = lambda: ['thing']
+    sys.modules['hooked'] = hooked
+    
+    try:
+        # Things served only by the hook are never indexed -- so the
+        # answer doesn’t flip-flop, and nothing gets evicted:
+        index = ThingnameIndex()
+        for _ in range(3):
+            assert index.lookup(id(thing)) == (None, None)
+        
+        # … whereas things in the modules’ namespace stick around:
+        hooked.thing = thing
+        for _ in range(3):
+            assert index.lookup(id(thing)) == (hooked, 'thing')
+        assert index.evictions == 0
+        assert not served
+    finally:
+        del sys.modules['hooked']
+    
+    print("»»» OK")
+    print()
+
+def test_parallel_scan():
+    """ » Checking that parallel index updates agree with serial ones … """
+    print(test_parallel_scan.__doc__)
+    print()
+    
+    serial = ThingnameIndex()
+    serial.update()
+    
+    # An early stop merges only a prefix of the module list, in order --
+    # so every entry it does make must agree with the serial scan:
+    parallel = ThingnameIndex().configure(workers=4)
+    parallel.update(id(thingname_search))
+    assert id(thingname_search) in parallel
+    for thingID, entry in tuple(parallel.__index__.items()):
+        if thingID in serial:
+            assert serial.__index__[thingID] == entry
+    
+    # A module whose scan hangs gets abandoned, and is retried next time --
+    # and as modules get scanned through their `__dict__` where possible,
+    # this one hides it, to be scanned the slow way:
+    class SluggishModule(type(sys)):
+        __dict__ = property(lambda self: None)
+        def __dir__(self):
+            return ['sluggish']
+        def __getattr__(self, key):
+            if key != 'sluggish':
+                raise AttributeError(key)
+            time.sleep(0.2)
+    
+    # … two of them, as a lone stale module gets scanned serially:
+    sluggards = tuple(SluggishModule('sluggish%s' % idx) for idx in range(2))
+    for sluggish in sluggards:
+        sys.modules[sluggish.__name__] = sluggish
+    
+    try:
+        parallel.configure(timeout=0.05)
+        for _ in range(2):
+            parallel.update()
+            for sluggish in sluggards:
+                assert id(sluggish) in parallel.__stalled__
+                assert parallel.stale(sluggish)
+    finally:
+        for sluggish in sluggards:
+            del sys.modules[sluggish.__name__]
+    
+    print("»»» OK")
+    print()
+
+def test_clade_throughput(duration=1.0):
+    """ » Checking `Clade.of(…)` classification throughput … """
+    print(test_clade_throughput.__doc__)
+    print()
+    
+    corpus = [1, 2.0, 3j, "yo", b"dogg", bytearray(b"i"), memoryview(b"heard"),
+              (1,), [2], { 'you' : 'like' }, { 3 }, frozenset({ 4 }),
+              None, True, Ellipsis, NotImplemented, Namespace(), range(5)]
+    
+    # N.B. a “cold” pass clears the dispatch table before each
+    # classification, and therefore runs the predicates every time:
+    print_separator()
+    for label, cold in (("cold", True), ("warm", False)):
+        count = 0
+        started = time.time()
+        while time.time() - started < duration:
+            for thing in corpus:
+                if cold:
+                    clade_dispatch.clear()
+                Clade.of(thing)
+                count += 1
+        elapsed = time.time() - started
+        print("»»» %s: %i objects/sec" % (label, int(count / elapsed)))
+    print_separator()
+    print()
+    
+    # Sanity-check the precompiled per-clade “isinstance” checks:
+    assert Clade.of(False) is Clade.SINGLETON
+    assert Clade.of(complex(1, 2)) is Clade.NUMBER
+    assert Clade.of(frozenset()) is Clade.SET
+    assert Clade.of(memoryview(b"")) is Clade.BYTES
+    assert Clade.of(list()) is Clade.SEQUENCE
+    
+    # Modules classify by their own attributes, whatever came first:
+    import operator, json
+    for modules in ((operator, json), (json, operator)):
+        clade_dispatch.clear()
+        clades = dict((module, Clade.of(module)) for module in modules)
+        assert clades[operator] is Clade.ITERABLE
+        assert clades[json] is Clade.INSTANCE
+
+def test_sanitize_engine(duration=0.5):
+    """ » Checking the compiled `sanitize(…)` engine … """
+    print(test_sanitize_engine.__doc__)
+    print()
+    
+    sanitize = exporter['sanitize']
+    sequentially = lambda text: sanitize_sequentially(text, sanitize.sanitizers)
+    
+    # The argument of the `√` rule sees the output of earlier rules,
+    # and later rules see the output of the `√` rule:
+    for text in (u"√é √£x √∂x √ß √Ø√x", u"“‘«»’”", u"", u"plain old ASCII",
+                 (u"…¡ﬂ™ hey √ƒ →‽ " * 1000) + u"⌘∞√∆"):
+        assert sanitize(text) == sequentially(text)
+        # Streaming in tiny chunks mustn’t change the output either:
+        assert u"".join(sanitize_stream(io.StringIO(text), chunksize=7)) == sanitize(text)
+    
+    # Rule sets with the same rules share a compiled engine:
+    assert sanitize.engine is rulesets['xcode-help'].extend('yo-dogg', ()).compile()
+    assert rulesets['ascii-strict'](u"√漢 – …") == u"sqrt(?) ? ..."
+    
+    # Compare throughput on mostly-ASCII text, with and without compiling:
+    text = (u"Usage: yo “dogg” – i heard you like √x and ∞ → ‽ ¶\n" + \
+            u"lorem ipsum dolor sit amet, and so on and so forth\n" * 20) * 500
+    print_separator()
+    count = 0
+    started = time.time()
+    while time.time() - started < duration:
+        sequentially(text)
+        count += len(text)
+    print("»»» sequential: %i chars/sec" % int(count / (time.time() - started)))
+    for name, rate in benchmark_rulesets(text, duration=duration).items():
+        print("»»» %s: %i chars/sec" % (name, rate))
+    print_separator()
+    print()
+
 def test():
     """ Inline tests for replutilities.py """
     
@@ -1640,6 +2571,13 @@ def test():
     if not TEXTMATE:
         test_qualified_import()
     test_determine_module()
+    test_lazy_module_scan()
+    test_deferred_export_scan()
+    test_star_import()
+    test_getattr_module_lookup()
+    test_parallel_scan()
+    test_clade_throughput()
+    test_sanitize_engine()
     
     # Re-print search-by-ID cache info and clade histogram:
     print("≠≠≠ POST-HOC EXPORTER STATS:")
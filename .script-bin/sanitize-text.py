@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+#
+#       sanitize-text.py
+#
+#       Sanitize text files (or STDIN) into an ASCII-friendly form,
+#       streaming them through `replsanitize.sanitize_stream(…)` --
+#       so logs of any size can be sanitized in constant memory.
+#       (c) 2019 Alexander Bohn, All Rights Reserved
+#
+u"""
+Usage:
+  sanitize-text.py [ INFILE... ]  [ -o OUTFILE   | --output=OUTFILE    ]
+                                  [ -r RULESET   | --rule-set=RULESET  ]
+                                  [ -c SIZE      | --chunk-size=SIZE   ]
+                                  [ -e ENCODING  | --encoding=ENCODING ]
+                                  [ -V           | --verbose           ]
+  sanitize-text.py                  -B           | --benchmark
+  sanitize-text.py                  -L           | --list-rule-sets
+  sanitize-text.py                  -h           | --help
+  sanitize-text.py                  -v           | --version
+
+Arguments:
+  INFILE                                Source file(s) to be sanitized, in order;
+                                        use "-" (or nothing at all) for STDIN.
+
+Options:
+  -o OUTFILE --output=OUTFILE           Output file; use "-" (or nothing at all)
+                                        for STDOUT.
+  -r RULESET --rule-set=RULESET         Name of the sanitizer rule set to use
+                                        [default: xcode-help].
+  -c SIZE --chunk-size=SIZE             Size of chunks to read [default: 65536].
+  -e ENCODING --encoding=ENCODING       Text encoding of input and output files
+                                        [default: utf-8].
+  -V --verbose                          Spew verbose output to stderr.
+  -B --benchmark                        Print the throughput of each rule set.
+  -L --list-rule-sets                   Print the names of all rule sets.
+  -h --help                             Show this text.
+  -v --version                          Print the program version and exit.
+
+"""
+
+from __future__ import print_function, unicode_literals
+from docopt import docopt, DocoptExit
+import sys, os
+import io
+import time
+
+from replsanitize import sanitize_stream, rulesets, benchmark_rulesets
+
+class DebugExit(SystemExit):
+    """ A signal to the caller to exit cleanly """
+    pass
+
+class ArgumentError(ValueError):
+    """ An issue with the supplied arguments """
+    pass
+
+DEBUG = bool(int(os.environ.get('DEBUG', '0'), base=10))
+VERSION = u'sanitize-text.py 0.1.0 © 2019 Alexander Böhn / OST, LLC'
+
+def binary_stream(stream):
+    """ Get the underlying binary stream of STDIN or STDOUT, if any """
+    return getattr(stream, 'buffer', stream)
+
+def cli(argv=None, debug=False):
+    if not argv:
+        argv = sys.argv
+    
+    arguments = docopt(__doc__, argv=argv[1:],
+                                help=True,
+                                version=VERSION)
+    
+    if debug:
+        from pprint import pprint
+        print()
+        print("» ARGV:")
+        pprint(argv)
+        print()
+        print("» ARGUMENTS (post-Docopt):")
+        pprint(arguments)
+        print()
+        raise DebugExit()
+    
+    if arguments.get('--list-rule-sets'):
+        for name, ruleset in sorted(rulesets.items()):
+            print("%-24s %i rules – %s" % (name, len(ruleset), ruleset.doc))
+        return
+    
+    if arguments.get('--benchmark'):
+        for name, rate in benchmark_rulesets().items():
+            print("%-24s %i chars/sec" % (name, rate))
+        return
+    
+    ipths = [pth == '-' and pth or os.path.expanduser(pth) \
+                             for pth in arguments.get('INFILE')] or ['-']
+    opth = arguments.get('--output')
+    encoding = arguments.get('--encoding')
+    verbose = bool(arguments.get('--verbose'))
+    
+    if arguments.get('--rule-set') not in rulesets:
+        raise ArgumentError("Unknown rule set: %s" % arguments.get('--rule-set'))
+    ruleset = rulesets[arguments.get('--rule-set')]
+    
+    try:
+        chunksize = int(arguments.get('--chunk-size'), base=10)
+    except ValueError:
+        raise ArgumentError("Bad chunk size: %s" % arguments.get('--chunk-size'))
+    if chunksize < 1:
+        raise ArgumentError("Bad chunk size: %s" % chunksize)
+    
+    for ipth in ipths:
+        if ipth != '-' and not os.path.isfile(ipth):
+            raise ArgumentError("Bad input file: %s" % ipth)
+    
+    if opth in (None, '-'):
+        output = binary_stream(sys.stdout)
+    else:
+        opth = os.path.expanduser(opth)
+        if os.path.exists(opth) or not os.path.isdir(os.path.dirname(os.path.abspath(opth))):
+            raise ArgumentError("Bad output file: %s" % opth)
+        output = io.open(opth, 'wb')
+    
+    characters = 0
+    started = time.time()
+    
+    try:
+        for ipth in ipths:
+            if ipth == '-':
+                source = binary_stream(sys.stdin)
+            else:
+                source = io.open(ipth, 'rb')
+            try:
+                for sanitized in sanitize_stream(source, sanitize=ruleset,
+                                                         chunksize=chunksize,
+                                                         encoding=encoding):
+                    output.write(sanitized.encode(encoding))
+                    characters += len(sanitized)
+            finally:
+                if source is not binary_stream(sys.stdin):
+                    source.close()
+    finally:
+        output.flush()
+        if output is not binary_stream(sys.stdout):
+            output.close()
+    
+    if verbose:
+        elapsed = time.time() - started
+        print("*** Sanitized %i characters from %i source(s) in %0.2fs (%i chars/sec)" % (
+              characters, len(ipths), elapsed, int(characters / max(elapsed, 1e-6))),
+              file=sys.stderr)
+
+def main(debug=False):
+    try:
+        cli(sys.argv, debug=debug)
+    except DebugExit:
+        # This is when we’re printing debug argument values:
+        raise
+    except DocoptExit:
+        # This is how default docopt usage gets printed:
+        raise
+    except ArgumentError:
+        print("[error] bad arguments passed:",
+              file=sys.stderr)
+        raise
+    sys.exit(0)
+
+if __name__ == '__main__':
+    main(debug=DEBUG)